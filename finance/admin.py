@@ -1,18 +1,103 @@
 from django.contrib import admin
-from finance.models import Transaction, Goal, CustomUser
-from import_export import resources
-from import_export.admin import ExportMixin
-
-class TransactionResource(resources.ModelResource):
-    class Meta:
-        model = Transaction
-        fields = ('date', 'title', 'amount', 'transaction_type')
-
-class TransactionAdmin(ExportMixin, admin.ModelAdmin):
-    resource_class = TransactionResource
-    list_display = ('date', 'title', 'amount', 'transaction_type')
+from django.contrib.auth import get_permission_codename
+from django.db import transaction
+from django.http import HttpResponse
+from finance import purge, search
+from finance.exports import XLSX_CONTENT_TYPE
+from finance.models import ArchivedTransaction, ArchiveSnapshot, Category, Transaction, Goal, CustomUser, ReportJob, UserBalance
+
+class TransactionAdmin(admin.ModelAdmin):
+    actions = ['export_csv', 'export_xlsx']
+    list_display = ('date', 'title', 'amount', 'transaction_type', 'category')
+    list_select_related = ('category',)
+    search_fields = ('title',)
+    raw_id_fields = ('user', 'category')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Uses the full-text index instead of a LIKE '%term%' table scan.
+        if not search_term:
+            return queryset, False
+        return search.search(queryset, search_term), False
+
+    def export(self, queryset, file_format, content_type):
+        # import_export, tablib and openpyxl are loaded on the first export
+        # rather than in every worker at startup (see finance.resources).
+        from finance.resources import TransactionResource
+
+        dataset = TransactionResource().export(queryset=queryset.order_by('date', 'pk'))
+        response = HttpResponse(dataset.export(file_format), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="transactions.{file_format}"'
+        return response
+
+    @admin.action(description="Export selected transactions as CSV")
+    def export_csv(self, request, queryset):
+        return self.export(queryset, 'csv', 'text/csv')
+
+    @admin.action(description="Export selected transactions as Excel")
+    def export_xlsx(self, request, queryset):
+        return self.export(queryset, 'xlsx', XLSX_CONTENT_TYPE)
+
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'user')
+    list_select_related = ('user',)
+    search_fields = ('name',)
+    raw_id_fields = ('user',)
+
+class ArchivedTransactionAdmin(admin.ModelAdmin):
+    list_display = ('date', 'title', 'amount', 'transaction_type', 'category_name', 'user_id')
     search_fields = ('title',)
 
+class ArchiveSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('user', 'year', 'category', 'transaction_type', 'total', 'count')
+    list_select_related = ('user', 'category')
+    raw_id_fields = ('user', 'category')
+
+class UserBalanceAdmin(admin.ModelAdmin):
+    list_display = ('user', 'total_income', 'total_expenses', 'transaction_count', 'modified_at')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+
+
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'format', 'status', 'attempts', 'worker', 'created_at', 'finished_at')
+    list_filter = ('status', 'format')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+
+
+class CustomUserAdmin(admin.ModelAdmin):
+    # Deleting goes through finance.purge: the default delete would collect
+    # every transaction of the account in memory, first for the confirmation
+    # page and again to delete them.
+    def get_deleted_objects(self, objs, request):
+        objs = list(objs)
+        counts = purge.related_counts([obj.pk for obj in objs])
+        # As Django's collector would: every model with rows to delete needs the delete permission.
+        perms_needed = {
+            str(model._meta.verbose_name)
+            for model in purge.MODELS
+            if model._meta.verbose_name_plural in counts
+            and not request.user.has_perm(
+                f'{model._meta.app_label}.{get_permission_codename("delete", model._meta)}'
+            )
+        }
+        return [str(obj) for obj in objs], counts, perms_needed, []
+
+    # The delete view runs in transaction.atomic; deferring the purge until
+    # it commits keeps each purge batch in its own short transaction.
+    def delete_model(self, request, obj):
+        pk = obj.pk
+        transaction.on_commit(lambda: purge.purge_user(pk))
+
+    def delete_queryset(self, request, queryset):
+        for pk in queryset.values_list('pk', flat=True):
+            transaction.on_commit(lambda pk=pk: purge.purge_user(pk))
+
 admin.site.register(Transaction, TransactionAdmin)
+admin.site.register(Category, CategoryAdmin)
 admin.site.register(Goal)
-admin.site.register(CustomUser)
+admin.site.register(ArchivedTransaction, ArchivedTransactionAdmin)
+admin.site.register(ArchiveSnapshot, ArchiveSnapshotAdmin)
+admin.site.register(UserBalance, UserBalanceAdmin)
+admin.site.register(ReportJob, ReportJobAdmin)
+admin.site.register(CustomUser, CustomUserAdmin)
@@ -0,0 +1,109 @@
+"""Ad-hoc aggregates over a user's transactions, served by ``/api/analytics``.
+
+A query (validated by ``AnalyticsQueryForm``) names a date range, a time
+grain, optional group-by dimensions and the measures to return. It compiles
+to one grouped statement: ``Trunc`` on the date, ``values()`` on the period
+and dimensions, and ``SUM``/``COUNT`` per group, capped at ``MAX_ROWS``
+groups. Averages are derived from the sum and count. Transactions in the
+archive are aggregated by the same statement against ``ArchivedTransaction``
+when the range reaches back before ``archived_until``, and merged per group.
+
+Results are cached like the dashboard sections, under a digest of the
+normalized query and the user's ``data_version``.
+"""
+import hashlib
+import json
+
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import Trunc
+
+from . import caching
+from .models import ArchivedTransaction, Transaction
+
+MAX_ROWS = 5000
+# Output column -> grouped field for live and archived rows.
+DIMENSIONS = {
+    'category': ('category__name', 'category_name'),
+    'type': ('transaction_type', 'transaction_type'),
+}
+
+
+def normalize(query):
+    """JSON-ready form of a cleaned ``AnalyticsQueryForm``."""
+    return {**query, 'start': query['start'].isoformat(), 'end': query['end'].isoformat()}
+
+
+def digest(query):
+    return hashlib.sha1(json.dumps(normalize(query), sort_keys=True).encode()).hexdigest()
+
+
+def section(query):
+    """Cache section name for ``caching.get_or_build``."""
+    return f'analytics:{digest(query)}'
+
+
+def grouped(model, user_id, query, archived=False):
+    """``(period, *dimensions, total, count)`` rows of one model, at most ``MAX_ROWS + 1``."""
+    # Categories are grouped by id, so a renamed category stays one group.
+    fields = ['period']
+    if 'category' in query['group_by']:
+        fields.append('category_id')
+    fields += [DIMENSIONS[name][archived] for name in query['group_by']]
+    return list(
+        model.objects
+        .filter(user_id=user_id, date__gte=query['start'], date__lte=query['end'])
+        .annotate(period=Trunc('date', query['grain'], output_field=DateField()))
+        .values(*fields)
+        .annotate(total=Sum('amount'), count=Count('pk'))
+        .order_by(*fields)
+        .values_list(*fields, 'total', 'count')[:MAX_ROWS + 1]
+    )
+
+
+def _key(row, query):
+    # Rows of both models merge on period, category id and type, not on the category name.
+    if 'category' in query['group_by']:
+        return (row[0], row[1], *row[3:-2])
+    return row[:-2]
+
+
+def run(user, query):
+    """The query's result as columns: ``{'columns': [...], 'data': [[...], ...], ...}``."""
+    rows = grouped(Transaction, user.pk, query)
+    if user.archived_until and query['start'] < user.archived_until:
+        merged = {}
+        # Archived rows renamed between archive runs are separate groups with one key; live rows
+        # come last, so the current category name wins.
+        for row in [*grouped(ArchivedTransaction, user.pk, query, archived=True), *rows]:
+            key = _key(row, query)
+            if key in merged:
+                row = (*row[:-2], merged[key][-2] + row[-2], merged[key][-1] + row[-1])
+            merged[key] = row
+        rows = [merged[key] for key in sorted(merged)]
+
+    truncated = len(rows) > MAX_ROWS
+    rows = rows[:MAX_ROWS]
+    skip = 'category' in query['group_by']  # the category id column is not returned
+    columns = ['period', *query['group_by'], *query['measures']]
+    data = [[row[0].isoformat() for row in rows]]
+    for index in range(len(query['group_by'])):
+        data.append([row[1 + skip + index] for row in rows])
+    for measure in query['measures']:
+        if measure == 'sum':
+            data.append([float(row[-2]) for row in rows])
+        elif measure == 'count':
+            data.append([row[-1] for row in rows])
+        else:
+            data.append([round(float(row[-2] / row[-1]), 2) for row in rows])
+    return {
+        'query': normalize(query),
+        'columns': columns,
+        'data': data,
+        'rows': len(rows),
+        'truncated': truncated,
+    }
+
+
+def get(user, query):
+    """Return ``(result, hit)``, from cache when possible."""
+    return caching.get_or_build(user, section(query), lambda: run(user, query))
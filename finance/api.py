@@ -0,0 +1,136 @@
+"""JSON endpoints: dashboard charts, ad-hoc analytics, bulk entry and report status.
+
+The dashboard and analytics responses carry an ETag derived from the
+user's ``data_modified_at`` timestamp; a matching ``If-None-Match`` gets an
+empty 304 before any dashboard data is read.
+"""
+import json
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.views import View
+
+from . import analytics, caching, dashboard, entry
+from .forms import AnalyticsQueryForm
+from .models import ReportJob
+
+
+class DashboardSectionView(LoginRequiredMixin, View):
+    raise_exception = True
+    section = None
+
+    def get(self, request, *args, **kwargs):
+        etag = quote_etag(caching.dashboard_etag(request.user, self.section))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            data, hit = dashboard.get_section(request.user, self.section)
+            response = JsonResponse(self.serialize(data))
+            response['X-Dashboard-Cache'] = 'hit' if hit else 'miss'
+        response['ETag'] = etag
+        # Let the browser keep the body but revalidate it on every use.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def serialize(self, data):
+        return data
+
+
+class DashboardSummaryView(DashboardSectionView):
+    section = 'summary'
+
+    def serialize(self, data):
+        return {
+            'total_income': data['total_income'],
+            'total_expenses': data['total_expenses'],
+            'balance': data['balance'],
+            'goals': [
+                {
+                    'id': item['goal'].pk,
+                    'name': item['goal'].name,
+                    'target_amount': item['goal'].target_amount,
+                    'deadline': item['goal'].deadline,
+                    'progress': item['progress'],
+                    'allocated': item['allocated'],
+                    'projected_completion': item['projected_completion'],
+                    'on_track': item['on_track'],
+                }
+                for item in data['goal_progress']
+            ],
+        }
+
+
+class DashboardCategoriesView(DashboardSectionView):
+    section = 'categories'
+
+
+class DashboardMonthlyView(DashboardSectionView):
+    section = 'monthly'
+
+
+class AnalyticsView(LoginRequiredMixin, View):
+    """Grouped totals for an ad-hoc query, in columns (see ``finance.analytics``)."""
+    raise_exception = True
+
+    def get(self, request, *args, **kwargs):
+        form = AnalyticsQueryForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+        query = form.cleaned_data
+        etag = quote_etag(caching.dashboard_etag(request.user, analytics.section(query)))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            data, hit = analytics.get(request.user, query)
+            response = JsonResponse(data)
+            response['X-Analytics-Cache'] = 'hit' if hit else 'miss'
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class TransactionBulkCreateView(LoginRequiredMixin, View):
+    """Create the transactions in a JSON array, all or none.
+
+    Each element has the ``TransactionForm`` fields: ``title``, ``amount``,
+    ``transaction_type``, ``date`` and ``category``. Invalid rows are
+    reported by index and nothing is saved.
+    """
+    raise_exception = True
+
+    def post(self, request, *args, **kwargs):
+        try:
+            rows = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({'error': 'The request body is not valid JSON.'}, status=400)
+        if not isinstance(rows, list) or not rows:
+            return JsonResponse({'error': 'Expected a non-empty array of transactions.'}, status=400)
+        if len(rows) > entry.MAX_JSON_ROWS:
+            return JsonResponse({'error': f'At most {entry.MAX_JSON_ROWS} transactions per request.'}, status=400)
+
+        forms = entry.json_forms(request.user, rows)
+        errors = entry.row_errors(forms)
+        if errors:
+            return JsonResponse({'errors': errors}, status=400)
+        created = entry.create_transactions(request.user, forms)
+        return JsonResponse({'created': len(created), 'ids': [row.pk for row in created]}, status=201)
+
+
+class ReportStatusView(LoginRequiredMixin, View):
+    """Status of one of the user's background reports, for polling."""
+    raise_exception = True
+
+    def get(self, request, pk, *args, **kwargs):
+        report = get_object_or_404(ReportJob, pk=pk, user=request.user)
+        response = JsonResponse({
+            'id': report.pk,
+            'format': report.format,
+            'status': report.status,
+            'created_at': report.created_at,
+            'finished_at': report.finished_at,
+            'error': report.error,
+            'download_url': reverse('download_report', args=[report.pk]) if report.status == ReportJob.DONE else None,
+        })
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
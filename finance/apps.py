@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class FinanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'finance'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from finance import signals  # noqa: F401
+        from finance.db import configure_sqlite
+
+        connection_created.connect(configure_sqlite, dispatch_uid='finance_configure_sqlite')
@@ -0,0 +1,135 @@
+"""Cold storage for old transactions.
+
+``archive_before`` moves transactions dated before a cut-off from
+``Transaction`` into ``ArchivedTransaction`` in batches. The cut-off is
+always 1 January, so every archived year is complete. Each batch adds its
+amounts to the per-year ``ArchiveSnapshot`` rows and then deletes the live
+rows, which recounts the ``MonthlyRollup`` months they came from. Dashboard
+totals come from the ``UserBalance`` ledger, which counts both, so they do
+not change.
+
+When the archive has its own database (see ``finance.routers``), the copy is
+committed first and the snapshot update and delete follow in one transaction
+on the default database. Re-running after an interruption skips rows that
+were already copied, so nothing is lost or counted twice.
+"""
+import time
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+from django.db.models import F, Q
+
+from . import ledger
+from .models import ArchivedTransaction, ArchiveSnapshot, CustomUser, Transaction
+
+BATCH_SIZE = 1000
+
+
+class ArchiveReport:
+    def __init__(self, cutoff):
+        self.cutoff = cutoff
+        self.archived = 0
+        self.users = set()
+        self.elapsed = 0.0
+
+    def summary(self):
+        return (
+            f"{self.archived} transactions dated before {self.cutoff} archived for "
+            f"{len(self.users)} users in {self.elapsed:.2f}s"
+        )
+
+
+def horizon_cutoff(years=None, today=None):
+    """1 January of the oldest year kept live under a ``years``-year horizon."""
+    years = settings.FINTRACK_ARCHIVE_HORIZON_YEARS if years is None else years
+    if years < 1:
+        # The dashboard's 12-month chart reads live rollups only.
+        raise ValueError("The archive horizon must be at least one year.")
+    today = today or date.today()
+    return date(today.year - years, 1, 1)
+
+
+def _archived_copy(row):
+    return ArchivedTransaction(
+        id=row.pk,
+        user_id=row.user_id,
+        title=row.title,
+        amount=row.amount,
+        transaction_type=row.transaction_type,
+        date=row.date,
+        category_id=row.category_id,
+        category_name=row.category.name,
+        import_hash=row.import_hash,
+    )
+
+
+def add_to_snapshots(rows):
+    """Fold transactions into the yearly snapshots, one write per bucket.
+
+    The ledger counts archived transactions too, so their amounts are added
+    back to it here; deleting the live rows takes them off again.
+    """
+    deltas = defaultdict(lambda: [Decimal(0), 0])
+    balances = ledger.new_deltas()
+    for row in rows:
+        key = (row.user_id, row.date.year, row.category_id, row.transaction_type)
+        deltas[key][0] += row.amount
+        deltas[key][1] += 1
+        ledger.add(balances, row.user_id, row.transaction_type, row.amount, 1)
+    ledger.adjust(balances)
+    for (user_id, year, category_id, transaction_type), (total, count) in deltas.items():
+        bucket = ArchiveSnapshot.objects.filter(
+            user_id=user_id, year=year, category_id=category_id, transaction_type=transaction_type,
+        )
+        if not bucket.update(total=F('total') + total, count=F('count') + count):
+            ArchiveSnapshot.objects.create(
+                user_id=user_id, year=year, category_id=category_id,
+                transaction_type=transaction_type, total=total, count=count,
+            )
+
+
+def _retire(batch, cutoff):
+    user_ids = {row.user_id for row in batch}
+    (CustomUser.objects
+     .filter(pk__in=user_ids)
+     .filter(Q(archived_until__isnull=True) | Q(archived_until__lt=cutoff))
+     .update(archived_until=cutoff))
+    add_to_snapshots(batch)
+    # Recounts the affected rollup months and bumps the users' data versions.
+    Transaction.objects.filter(pk__in=[row.pk for row in batch]).delete()
+
+
+def archive_before(cutoff, user_ids=None, batch_size=BATCH_SIZE):
+    """Archive every transaction dated before ``cutoff`` (a 1 January)."""
+    if (cutoff.month, cutoff.day) != (1, 1):
+        raise ValueError("Archive cut-offs must fall on 1 January so archived years are complete.")
+    report = ArchiveReport(cutoff)
+    started = time.perf_counter()
+    archive_db = router.db_for_write(ArchivedTransaction)
+
+    candidates = Transaction.objects.filter(date__lt=cutoff).select_related('category').order_by('pk')
+    if user_ids is not None:
+        candidates = candidates.filter(user_id__in=user_ids)
+
+    while True:
+        batch = list(candidates[:batch_size])
+        if not batch:
+            break
+        copies = [_archived_copy(row) for row in batch]
+        if archive_db == DEFAULT_DB_ALIAS:
+            with transaction.atomic():
+                ArchivedTransaction.objects.bulk_create(copies, ignore_conflicts=True)
+                _retire(batch, cutoff)
+        else:
+            with transaction.atomic(using=archive_db):
+                ArchivedTransaction.objects.bulk_create(copies, ignore_conflicts=True)
+            with transaction.atomic():
+                _retire(batch, cutoff)
+        report.archived += len(batch)
+        report.users.update(row.user_id for row in batch)
+
+    report.elapsed = time.perf_counter() - started
+    return report
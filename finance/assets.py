@@ -0,0 +1,82 @@
+"""Build step for static assets (see the ``build_static`` command).
+
+``build_logos`` writes resized PNG and WebP copies of the logos into
+``static/logos/`` at the sizes the templates display them, at 1x and 2x.
+``collectstatic`` then copies everything to ``STATIC_ROOT``, under content-
+hashed names when ``ManifestStaticFilesStorage`` is on, and ``precompress``
+writes ``.gz`` (and, with the optional ``brotli`` package, ``.br``) files next
+to the text assets for the web server to send as they are.
+"""
+import gzip
+from pathlib import Path
+
+from PIL import Image
+
+try:
+    import brotli
+except ImportError:  # Optional; only gzip copies are written without it.
+    brotli = None
+
+LOGO_DIR = 'logos'
+# Source file -> displayed widths in CSS pixels; each is written at 1x and 2x.
+LOGO_WIDTHS = {
+    'logo.png': (400,),  # landing page hero
+    'logo3.png': (40,),  # navigation bar
+}
+WEBP_QUALITY = 85
+COMPRESSIBLE_SUFFIXES = {'.css', '.js', '.svg', '.json', '.txt', '.html', '.map', '.xml'}
+# Below this, compression saves less than the extra request header costs.
+MIN_COMPRESS_BYTES = 256
+
+
+def logo_variant_name(source, width, suffix):
+    return f'{LOGO_DIR}/{Path(source).stem}-{width}{suffix}'
+
+
+def build_logos(static_dir):
+    """Write the resized logos under ``static_dir``; returns ``(path, bytes)`` per file written."""
+    static_dir = Path(static_dir)
+    (static_dir / LOGO_DIR).mkdir(exist_ok=True)
+    written = []
+    for source, widths in LOGO_WIDTHS.items():
+        with Image.open(static_dir / source) as image:
+            image.load()
+            for width in sorted({w * scale for w in widths for scale in (1, 2)}):
+                height = round(image.height * width / image.width)
+                resized = image.resize((width, height), Image.LANCZOS)
+                for suffix, options in (('.png', {'optimize': True}), ('.webp', {'quality': WEBP_QUALITY, 'method': 6})):
+                    path = static_dir / logo_variant_name(source, width, suffix)
+                    resized.save(path, **options)
+                    written.append((path, path.stat().st_size))
+    return written
+
+
+def precompress(root):
+    """Write ``.gz``/``.br`` copies of the text assets under ``root``.
+
+    Returns ``(path, original, gzip, brotli)`` sizes per file; ``brotli`` is
+    ``None`` when the package is not installed. A compressed copy is only
+    kept when it is smaller than the original.
+    """
+    results = []
+    for path in sorted(Path(root).rglob('*')):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        data = path.read_bytes()
+        if len(data) < MIN_COMPRESS_BYTES:
+            continue
+        # mtime=0 keeps the output identical between builds.
+        gz = _write_if_smaller(path.with_name(path.name + '.gz'), gzip.compress(data, 9, mtime=0), len(data))
+        br = None
+        if brotli is not None:
+            br = _write_if_smaller(path.with_name(path.name + '.br'), brotli.compress(data), len(data))
+        results.append((path, len(data), gz, br))
+    return results
+
+
+def _write_if_smaller(path, compressed, original_size):
+    if len(compressed) >= original_size:
+        path.unlink(missing_ok=True)
+        return None
+    path.write_bytes(compressed)
+    return len(compressed)
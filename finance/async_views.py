@@ -0,0 +1,132 @@
+"""Async versions of the read-heavy views, routed instead of the sync ones
+when ``FINTRACK_ASYNC_VIEWS`` is on (the default under ``finexp.asgi``).
+
+They use the async ORM and await independent queries together with
+``asyncio.gather``. On Django 5.2 the async ORM still runs each query through
+``sync_to_async`` on the request's one thread-sensitive executor thread, so
+the gathered queries are serialized there; what the event loop gains is not
+being blocked while they run. Every queryset a template would iterate is
+evaluated before rendering, because lazy ORM access from async code raises
+``SynchronousOnlyOperation``.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.mixins import AccessMixin
+from django.shortcuts import redirect, render
+from django.views import View
+
+from . import dashboard, search
+from .exports import archived_transactions
+from .forms import TransactionFilterForm
+from .models import Category, CustomUser, Goal, SiteStats, Transaction
+from .pagination import apaginate_keyset, apaginate_ranked
+from .views import TransactionListView
+
+
+class AsyncLoginRequiredMixin(AccessMixin):
+    """``LoginRequiredMixin`` for async views; resolves ``request.user`` without blocking."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Replace the lazy user so that templates and messages never query for it.
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncDashboardView(AsyncLoginRequiredMixin, View):
+    async def get(self, request, *args, **kwargs):
+        context, hit = await dashboard.aget_section(request.user, 'summary')
+        response = render(request, 'finance/dashboard.html', context)
+        response['X-Dashboard-Cache'] = 'hit' if hit else 'miss'
+        return response
+
+
+class AsyncTransactionListView(AsyncLoginRequiredMixin, View):
+    paginate_by = TransactionListView.paginate_by
+
+    async def get(self, request, *args, **kwargs):
+        filter_form = TransactionFilterForm(request.GET, user=request.user)
+        # Validating the category filter looks the category up.
+        await sync_to_async(filter_form.is_valid)()
+        transactions = filter_form.filter(Transaction.objects.filter(user=request.user).select_related('category'))
+
+        if filter_form.search_text:
+            paginate = apaginate_ranked(
+                search.search(transactions, filter_form.search_text, user_id=request.user.pk),
+                page=request.GET.get('page'),
+                per_page=self.paginate_by,
+            )
+        else:
+            paginate = apaginate_keyset(
+                transactions,
+                after=request.GET.get('after'),
+                before=request.GET.get('before'),
+                per_page=self.paginate_by,
+                archive=archived_transactions(request.user, filter_form),
+                archive_until=request.user.archived_until,
+            )
+        page, categories = await asyncio.gather(paginate, self.category_choices(request.user))
+        category_field = filter_form.fields['category']
+        category_field.choices = [('', category_field.empty_label)] + categories
+
+        filter_params = request.GET.copy()
+        for param in ('after', 'before', 'page'):
+            filter_params.pop(param, None)
+
+        return render(request, 'finance/transaction_list.html', {
+            'transactions': page,
+            'page': page,
+            'filter_form': filter_form,
+            'filter_query': filter_params.urlencode(),
+        })
+
+    async def category_choices(self, user):
+        return [choice async for choice in Category.objects.filter(user=user).values_list('pk', 'name')]
+
+
+class AsyncGoalListView(AsyncLoginRequiredMixin, View):
+    async def get(self, request, *args, **kwargs):
+        goals = [goal async for goal in Goal.objects.filter(user=request.user)]
+        return render(request, 'finance/goal_list.html', {'goals': goals})
+
+
+class AsyncAdminDashboardView(AsyncLoginRequiredMixin, View):
+    async def get(self, request, *args, **kwargs):
+        if not request.user.is_staff:
+            messages.error(request, 'Access denied. Staff privileges required.')
+            return redirect('dashboard')
+
+        stats, recent_users, recent_transactions = await asyncio.gather(
+            self.site_stats(),
+            self.fetch(CustomUser.objects.order_by('-date_joined')[:5]),
+            self.fetch(Transaction.objects.select_related('user', 'category').order_by('-date')[:10]),
+        )
+        return render(request, 'finance/admin_dashboard.html', {
+            'stats': stats,
+            'total_users': stats.total_users,
+            'active_users': stats.active_users,
+            'total_transactions': stats.total_transactions,
+            'total_goals': stats.total_goals,
+            'recent_users': recent_users,
+            'recent_transactions': recent_transactions,
+            'users_with_transactions': stats.users_with_transactions,
+            'users_with_goals': stats.users_with_goals,
+        })
+
+    async def post(self, request, *args, **kwargs):
+        if not request.user.is_staff:
+            messages.error(request, 'Access denied. Staff privileges required.')
+            return redirect('dashboard')
+
+        await sync_to_async(SiteStats.refresh)()
+        messages.success(request, 'Site statistics refreshed.')
+        return redirect('admin_dashboard')
+
+    async def site_stats(self):
+        return await SiteStats.objects.filter(pk=1).afirst() or await sync_to_async(SiteStats.refresh)()
+
+    async def fetch(self, queryset):
+        return [obj async for obj in queryset]
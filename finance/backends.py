@@ -0,0 +1,40 @@
+"""Authentication backend that serves the signed-in user from the cache.
+
+``AuthenticationMiddleware`` loads the user on every request. The loaded
+``CustomUser`` is cached under its id for ``FINTRACK_USER_CACHE_TIMEOUT``
+seconds, and ``finance.caching.forget_users`` drops it whenever the row
+changes: on every save (including profile edits and ``last_login``
+updates), on delete, and when the user's ``data_version`` is bumped.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+
+from .caching import get_user_cache, user_key
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        timeout = settings.FINTRACK_USER_CACHE_TIMEOUT
+        if timeout <= 0:
+            return super().get_user(user_id)
+        cache = get_user_cache()
+        user = cache.get(user_key(user_id))
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(user_key(user_id), user, timeout)
+            return user
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        timeout = settings.FINTRACK_USER_CACHE_TIMEOUT
+        if timeout <= 0:
+            return await super().aget_user(user_id)
+        cache = get_user_cache()
+        user = await cache.aget(user_key(user_id))
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await cache.aset(user_key(user_id), user, timeout)
+            return user
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,577 @@
+"""Synthetic data and a repeatable latency benchmark for the views in ``finance.urls``.
+
+``seed`` bulk-generates users, categories, transactions and goals from a
+fixed random seed, so two databases seeded with the same options hold the
+same data. ``run`` drives every route through the Django test client and
+records latency percentiles, SQL query count and time, and peak Python
+memory; ``run_concurrency`` measures read/write throughput from several
+worker processes sharing the database, ``run_templates`` times the
+transaction list template alone, and ``run_entry`` compares adding
+transactions one form at a time with the multi-row page and the JSON
+endpoint. ``run_startup`` times a fresh worker process loading the WSGI
+application. ``compare`` checks a run against a saved
+baseline so a release can be gated on regressions.
+"""
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, models
+from django.template import Engine, RequestContext
+from django.test import Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import forecasting, rollups
+from .caching import bump_data_version, get_cache
+from .forms import TransactionFilterForm
+from .models import Category, CustomUser, Goal, SiteStats, Transaction
+from .pagination import KeysetPage
+
+DEFAULT_PREFIX = 'bench'
+BENCHMARK_PASSWORD = 'benchmark-password'
+CATEGORY_NAMES = [
+    'Groceries', 'Rent', 'Utilities', 'Transport', 'Dining', 'Health', 'Travel', 'Shopping',
+    'Entertainment', 'Insurance', 'Education', 'Gifts', 'Subscriptions', 'Pets', 'Home', 'Fees',
+]
+INCOME_CATEGORIES = ['Salary', 'Freelance', 'Interest']
+TITLES = ['Card payment', 'Direct debit', 'Transfer', 'Standing order', 'Cash withdrawal', 'Online order']
+
+# (name, url name, query string); every GET route in finance.urls.
+ROUTES = [
+    ('landing', 'landing', {}),
+    ('login', 'login', {}),
+    ('register', 'register', {}),
+    ('dashboard', 'dashboard', {}),
+    ('admin-dashboard', 'admin_dashboard', {}),
+    ('profile', 'profile', {}),
+    ('transaction-add', 'transaction_add', {}),
+    ('transaction-bulk-add', 'transaction_bulk_add', {}),
+    ('transactions', 'transaction_list', {}),
+    ('transactions-filtered', 'transaction_list', {'transaction_type': 'expense'}),
+    ('transaction-import', 'transaction_import', {}),
+    ('goals', 'goal_list', {}),
+    ('goal-add', 'goal_add', {}),
+    ('generate-report-xlsx', 'export_transactions', {}),
+    ('generate-report-csv', 'export_transactions', {'format': 'csv'}),
+    ('reports', 'report_list', {}),
+    ('api-summary', 'api_dashboard_summary', {}),
+    ('api-categories', 'api_dashboard_categories', {}),
+    ('api-monthly', 'api_dashboard_monthly', {}),
+    ('api-analytics', 'api_analytics', {'grain': 'week', 'group_by': ['category', 'type'], 'measures': ['sum', 'count']}),
+]
+
+
+class SeedReport:
+    def __init__(self):
+        self.users = 0
+        self.transactions = 0
+        self.goals = 0
+        self.elapsed = 0.0
+
+    def summary(self):
+        return (
+            f"{self.users} users, {self.transactions} transactions and {self.goals} goals "
+            f"in {self.elapsed:.1f}s ({self.transactions / (self.elapsed or 1):.0f} transactions/sec)"
+        )
+
+
+def _random_amount(rng, transaction_type):
+    # Log-normal amounts: mostly small expenses with a long tail; incomes are larger.
+    mu = 7.5 if transaction_type == 'income' else 3.5
+    return min(Decimal(round(rng.lognormvariate(mu, 0.9), 2)), Decimal('99999999.99')).quantize(Decimal('0.01'))
+
+
+def _transactions(rng, user, categories, expense_names, count, years, income_share, today):
+    span = years * 365
+    for _ in range(count):
+        transaction_type = 'income' if rng.random() < income_share else 'expense'
+        names = INCOME_CATEGORIES if transaction_type == 'income' else expense_names
+        yield Transaction(
+            user=user,
+            title=rng.choice(TITLES),
+            amount=_random_amount(rng, transaction_type),
+            transaction_type=transaction_type,
+            date=today - timedelta(days=rng.randrange(span)),
+            category=categories[Category.normalize(rng.choice(names))],
+        )
+
+
+def seed(users=10, transactions=100_000, years=10, goals_per_user=3, categories=12,
+         income_share=0.3, prefix=DEFAULT_PREFIX, random_seed=42, batch_size=5000, progress=None):
+    """Create ``users`` users sharing ``transactions`` rows spread over ``years``.
+
+    The first user is staff so the admin dashboard can be benchmarked. Rows
+    are inserted with a plain ``bulk_create`` and the rollups rebuilt once per
+    user afterwards, which is far cheaper than incremental maintenance.
+    """
+    rng = random.Random(random_seed)
+    today = date.today()
+    report = SeedReport()
+    started = time.perf_counter()
+    password = make_password(BENCHMARK_PASSWORD)
+
+    created = CustomUser.objects.bulk_create([
+        CustomUser(
+            username=f'{prefix}{index:05d}', email=f'{prefix}{index:05d}@example.com',
+            password=password, is_staff=index == 0,
+        )
+        for index in range(users)
+    ])
+    report.users = len(created)
+
+    plain = models.QuerySet(model=Transaction)
+    per_user, remainder = divmod(transactions, max(users, 1))
+    for index, user in enumerate(created):
+        expense_names = CATEGORY_NAMES[:categories]
+        resolved = Category.objects.resolve(user, expense_names + INCOME_CATEGORIES)
+        rows = _transactions(
+            rng, user, resolved, expense_names, per_user + (index < remainder), years, income_share, today,
+        )
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                plain.bulk_create(batch)
+                report.transactions += len(batch)
+                batch = []
+        if batch:
+            plain.bulk_create(batch)
+            report.transactions += len(batch)
+        rollups.rebuild_user(user.pk)
+
+        Goal.objects.bulk_create([
+            Goal(
+                user=user, name=f'Goal {number + 1}',
+                target_amount=Decimal(rng.randrange(500, 50_000)),
+                deadline=today + timedelta(days=rng.randrange(30, 5 * 365)),
+            )
+            for number in range(goals_per_user)
+        ])
+        report.goals += goals_per_user
+        if progress:
+            progress(index + 1, report)
+
+    user_ids = [user.pk for user in created]
+    bump_data_version(user_ids)
+    for start in range(0, len(user_ids), forecasting.BATCH_SIZE):
+        forecasting.forecast_users(user_ids[start:start + forecasting.BATCH_SIZE])
+    SiteStats.refresh()
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def _request(client, url, params):
+    response = client.get(url, params)
+    if getattr(response, 'streaming', False):
+        size = sum(len(chunk) for chunk in response.streaming_content)
+    else:
+        size = len(response.content)
+    response.close()
+    return response, size
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() or None
+
+
+def run(user, iterations=20, warmup=2, routes=None, cold=False):
+    """Benchmark ``routes`` (default: all of ``ROUTES``) logged in as ``user``.
+
+    With ``cold`` the dashboard cache is cleared before every request, so the
+    numbers cover the uncached path.
+    """
+    selected = [route for route in ROUTES if not routes or route[0] in routes]
+    client = Client()
+    client.force_login(user)
+    results = {}
+
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for name, url_name, params in selected:
+            url = reverse(url_name)
+            for _ in range(warmup):
+                _request(client, url, params)
+
+            latencies, query_counts, query_times = [], [], []
+            for _ in range(iterations):
+                if cold:
+                    get_cache().clear()
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response, size = _request(client, url, params)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                query_counts.append(len(queries.captured_queries))
+                query_times.append(sum(float(query['time']) for query in queries.captured_queries) * 1000)
+
+            # A separate pass: tracemalloc slows everything down, so it must not
+            # overlap with the timed iterations.
+            if cold:
+                get_cache().clear()
+            tracemalloc.start()
+            _request(client, url, params)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            results[name] = {
+                'status': response.status_code,
+                'bytes': size,
+                'p50_ms': round(percentile(latencies, 0.50), 3),
+                'p95_ms': round(percentile(latencies, 0.95), 3),
+                'mean_ms': round(statistics.fmean(latencies), 3),
+                'queries': max(query_counts),
+                'sql_ms': round(statistics.fmean(query_times), 3),
+                'peak_memory_kb': round(peak / 1024, 1),
+            }
+
+    return {
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'cache': settings.CACHES[settings.FINTRACK_DASHBOARD_CACHE]['BACKEND'],
+        'dataset': {
+            'user': user.username,
+            'transactions': Transaction.objects.filter(user=user).count(),
+            'goals': Goal.objects.filter(user=user).count(),
+            'total_transactions': Transaction.objects.count(),
+        },
+        'config': {'iterations': iterations, 'warmup': warmup, 'cold': cold},
+        'routes': results,
+    }
+
+
+CONCURRENCY_TITLE = 'concurrency benchmark'
+
+
+def _concurrency_worker(user_pk, deadline, write_share, worker_seed):
+    """One simulated application worker: mixed reads and writes until ``deadline``."""
+    from django.db import OperationalError
+
+    rng = random.Random(worker_seed)
+    client = Client()
+    client.force_login(CustomUser.objects.get(pk=user_pk))
+    read_url, write_url = reverse('transaction_list'), reverse('transaction_add')
+    stats = {'read': [], 'write': [], 'errors': 0, 'locked': 0}
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        while time.time() < deadline:
+            kind = 'write' if rng.random() < write_share else 'read'
+            started = time.perf_counter()
+            try:
+                if kind == 'write':
+                    response = client.post(write_url, {
+                        'title': CONCURRENCY_TITLE, 'amount': '1.00', 'transaction_type': 'expense',
+                        'date': date.today().isoformat(), 'category': 'Benchmark',
+                    })
+                    ok = response.status_code == 302
+                else:
+                    ok = client.get(read_url).status_code == 200
+            except OperationalError as exc:
+                ok = False
+                stats['locked'] += 'locked' in str(exc)
+            if ok:
+                stats[kind].append((time.perf_counter() - started) * 1000)
+            else:
+                stats['errors'] += 1
+    connection.close()
+    return stats
+
+
+def run_concurrency(user, workers=8, duration=10.0, write_share=0.2):
+    """Run ``workers`` processes against the configured database, like a multi-worker deployment.
+
+    Rows written by the benchmark are removed afterwards.
+    """
+    import multiprocessing
+
+    from django.db import connections
+
+    connections.close_all()  # children must open their own connections
+    deadline = time.time() + duration
+    context = multiprocessing.get_context('fork')
+    with context.Pool(workers) as pool:
+        per_worker = pool.starmap(
+            _concurrency_worker,
+            [(user.pk, deadline, write_share, index) for index in range(workers)],
+        )
+    Transaction.objects.filter(user=user, title=CONCURRENCY_TITLE).delete()
+
+    result = {
+        'workers': workers,
+        'duration_s': duration,
+        'journal_mode': _journal_mode(),
+        'errors': sum(stats['errors'] for stats in per_worker),
+        'locked': sum(stats['locked'] for stats in per_worker),
+    }
+    for kind in ('read', 'write'):
+        latencies = [value for stats in per_worker for value in stats[kind]]
+        result[kind] = {
+            'ops': len(latencies),
+            'ops_per_sec': round(len(latencies) / duration, 1),
+            'p50_ms': round(percentile(latencies, 0.50), 3) if latencies else None,
+            'p95_ms': round(percentile(latencies, 0.95), 3) if latencies else None,
+        }
+    return result
+
+
+def _journal_mode():
+    if connection.vendor != 'sqlite':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode')
+        return cursor.fetchone()[0]
+
+
+def _render_transaction_list(engine, request, context):
+    template = engine.get_template('finance/transaction_list.html')
+    started = time.perf_counter()
+    template.render(RequestContext(request, context))
+    return (time.perf_counter() - started) * 1000
+
+
+def run_templates(user, rows=1000, iterations=20):
+    """Time rendering the transaction list with ``rows`` rows, in ms per 1,000 rows.
+
+    ``uncached_loader`` re-reads and compiles the templates on every render,
+    as the old ``APP_DIRS`` setup did with ``DEBUG`` on; ``cached_loader`` is
+    the current configuration on a fragment-cache miss; ``fragment_hit``
+    renders with the row fragments already cached.
+    """
+    objects = list(
+        Transaction.objects.filter(user=user).select_related('category').order_by('-date', '-pk')[:rows]
+    )
+    if not objects:
+        raise ValueError(f"{user.username} has no transactions to render.")
+    page = KeysetPage(objects)
+    filter_form = TransactionFilterForm(user=user)
+    # Saves the category query that rendering the <select> would otherwise make.
+    filter_form.fields['category'].choices = [('', 'All categories')] + list(
+        Category.objects.filter(user=user).values_list('pk', 'name')
+    )
+    context = {'transactions': page, 'page': page, 'filter_form': filter_form, 'filter_query': ''}
+
+    project_engine = Engine.get_default()
+    uncached_engine = Engine(
+        loaders=['django.template.loaders.app_directories.Loader'],
+        context_processors=project_engine.context_processors,
+        libraries=project_engine.libraries,
+        debug=True,
+    )
+    factory = RequestFactory()
+    url = reverse('transaction_list')
+
+    def make_request(params):
+        request = factory.get(url, params)
+        request.user = user
+        return request
+
+    scale = 1000 / len(objects)
+    results = {}
+    for name, engine in (('uncached_loader', uncached_engine), ('cached_loader', project_engine)):
+        # A fresh query string per render makes every fragment lookup miss.
+        results[name] = [
+            _render_transaction_list(engine, make_request({'n': f'{name}-{n}'}), context) for n in range(iterations)
+        ]
+    warm = make_request({'n': 'warm'})
+    _render_transaction_list(project_engine, warm, context)
+    results['fragment_hit'] = [_render_transaction_list(project_engine, warm, context) for _ in range(iterations)]
+
+    return {
+        'commit': _git_commit(),
+        'rows': len(objects),
+        'iterations': iterations,
+        'modes': {
+            name: {
+                'p50_ms_per_1k_rows': round(percentile(timings, 0.50) * scale, 3),
+                'mean_ms_per_1k_rows': round(statistics.fmean(timings) * scale, 3),
+            }
+            for name, timings in results.items()
+        },
+    }
+
+
+ENTRY_TITLE = 'entry benchmark'
+
+
+def _entry_rows(count, today):
+    return [
+        {'title': ENTRY_TITLE, 'amount': f'{10 + index % 90}.50', 'transaction_type': 'expense',
+         'date': (today - timedelta(days=index % 365)).isoformat(), 'category': CATEGORY_NAMES[index % 4]}
+        for index in range(count)
+    ]
+
+
+def run_entry(user, rows=200, batch_size=20):
+    """Requests/sec and rows/sec for adding ``rows`` transactions three ways.
+
+    ``single_form`` posts one ``TransactionForm`` per request, as the "Add
+    Transaction" page does; ``formset`` and ``json`` send ``batch_size`` rows
+    per request to the multi-row page and to ``/api/transactions``. Rows
+    written by the benchmark are removed afterwards.
+    """
+    client = Client()
+    client.force_login(user)
+    data = _entry_rows(rows, date.today())
+    batches = [data[start:start + batch_size] for start in range(0, rows, batch_size)]
+    prefix = 'form'
+
+    def formset_post(batch):
+        payload = {f'{prefix}-TOTAL_FORMS': len(batch), f'{prefix}-INITIAL_FORMS': 0}
+        for index, row in enumerate(batch):
+            payload.update({f'{prefix}-{index}-{field}': value for field, value in row.items()})
+        return client.post(reverse('transaction_bulk_add'), payload)
+
+    modes = {
+        'single_form': ([[row] for row in data], lambda batch: client.post(reverse('transaction_add'), batch[0]), 302),
+        'formset': (batches, formset_post, 302),
+        'json': (batches, lambda batch: client.post(
+            reverse('api_transactions'), json.dumps(batch), content_type='application/json',
+        ), 201),
+    }
+    results = {}
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for name, (requests, send, expected) in modes.items():
+            started = time.perf_counter()
+            for batch in requests:
+                response = send(batch)
+                if response.status_code != expected:
+                    raise RuntimeError(f"{name}: unexpected status {response.status_code}")
+            elapsed = time.perf_counter() - started
+            results[name] = {
+                'requests': len(requests),
+                'requests_per_sec': round(len(requests) / elapsed, 1),
+                'rows_per_sec': round(rows / elapsed, 1),
+            }
+    Transaction.objects.filter(user=user, title=ENTRY_TITLE).delete()
+    return {'commit': _git_commit(), 'rows': rows, 'batch_size': batch_size, 'modes': results}
+
+
+# Modules only export and asset builds need; a worker should not load them at startup.
+DEFERRED_MODULES = ('import_export', 'tablib', 'openpyxl', 'PIL')
+STARTUP_BUDGET_MS = 600
+STARTUP_BUDGET_RSS_MB = 70
+_STARTUP_SCRIPT = """
+import json, resource, sys, time
+started = time.perf_counter()
+from django.conf import settings
+from django.utils.module_loading import import_string
+import_string(settings.WSGI_APPLICATION)
+loaded = time.perf_counter()
+import_string(settings.ROOT_URLCONF + '.urlpatterns')  # what the first request would import
+ready = time.perf_counter()
+print(json.dumps({
+    'wsgi_ms': (loaded - started) * 1000,
+    'ready_ms': (ready - started) * 1000,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'deferred_loaded': sorted(name for name in sys.argv[1:] if name in sys.modules),
+}))
+"""
+
+
+def _slowest_imports(importtime, limit):
+    """Top-level imports with the largest cumulative time from ``-X importtime`` output."""
+    imports = []
+    for line in importtime.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not name.startswith('   '):  # only direct imports of the script, not their children
+            imports.append((int(cumulative) / 1000, name.strip()))
+    return [{'module': name, 'ms': round(ms, 1)} for ms, name in sorted(imports, reverse=True)[:limit]]
+
+
+def run_startup(runs=5, top=10):
+    """Cold start of ``runs`` fresh processes loading the WSGI application and URLconf.
+
+    Reports median milliseconds to a loaded application (``wsgi_ms``) and to
+    a worker ready for its first request (``ready_ms``), peak RSS, the
+    ``DEFERRED_MODULES`` that got imported, the slowest imports, and the
+    wall time of ``manage.py check``.
+    """
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+    samples, importtime = [], ''
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', _STARTUP_SCRIPT, *DEFERRED_MODULES],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        samples.append(json.loads(result.stdout.splitlines()[-1]))
+        importtime = result.stderr
+
+    started = time.perf_counter()
+    subprocess.run([sys.executable, 'manage.py', 'check'], cwd=settings.BASE_DIR, env=env,
+                   capture_output=True, check=True)
+    check_ms = (time.perf_counter() - started) * 1000
+    return {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'runs': runs,
+        'wsgi_ms': round(statistics.median(sample['wsgi_ms'] for sample in samples), 1),
+        'ready_ms': round(statistics.median(sample['ready_ms'] for sample in samples), 1),
+        'max_rss_mb': round(statistics.median(sample['max_rss_kb'] for sample in samples) / 1024, 1),
+        'check_ms': round(check_ms, 1),
+        'deferred_loaded': samples[-1]['deferred_loaded'],
+        'slowest_imports': _slowest_imports(importtime, top),
+    }
+
+
+def check_startup(result, budget_ms=STARTUP_BUDGET_MS, budget_rss_mb=STARTUP_BUDGET_RSS_MB):
+    """Messages for every way ``result`` of ``run_startup`` exceeds its budget."""
+    problems = []
+    if result['ready_ms'] > budget_ms:
+        problems.append(f"ready in {result['ready_ms']:.0f}ms, budget {budget_ms}ms")
+    if result['max_rss_mb'] > budget_rss_mb:
+        problems.append(f"RSS {result['max_rss_mb']:.1f}MB, budget {budget_rss_mb}MB")
+    if result['deferred_loaded']:
+        problems.append(f"loaded at startup: {', '.join(result['deferred_loaded'])}")
+    return problems
+
+
+def compare(current, baseline, threshold=0.2):
+    """Return ``(route, message)`` pairs for regressions against ``baseline``.
+
+    A route regresses when it issues more queries, or its p95 latency grew by
+    more than ``threshold`` (a fraction) over the baseline.
+    """
+    regressions = []
+    for name, result in current['routes'].items():
+        before = baseline.get('routes', {}).get(name)
+        if before is None:
+            continue
+        if result['queries'] > before['queries']:
+            regressions.append((name, f"queries {before['queries']} -> {result['queries']}"))
+        if result['p95_ms'] > before['p95_ms'] * (1 + threshold):
+            regressions.append((name, f"p95 {before['p95_ms']:.1f}ms -> {result['p95_ms']:.1f}ms"))
+        if result['status'] != before['status']:
+            regressions.append((name, f"status {before['status']} -> {result['status']}"))
+    return regressions
+
+
+def load(path):
+    return json.loads(Path(path).read_text())
@@ -0,0 +1,140 @@
+"""Per-user versioned caching of computed dashboard data.
+
+``CustomUser.data_version`` is bumped whenever one of the user's
+transactions, goals or categories changes. Cache keys embed that version,
+so a write never has to find and delete stale entries: the next read simply
+misses and the old entry expires on its own. The version travels on the
+user object that ``AuthenticationMiddleware`` already loads, so checking it
+costs no extra query; ``finance.backends.CachedModelBackend`` serves that
+object from the cache, and every change to the user row clears it with
+``forget_users``.
+"""
+import hashlib
+import logging
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = 'finance:dashboard:stats:{}'
+USER_KEY = 'finance:user:{}'
+
+
+def get_cache():
+    return caches[getattr(settings, 'FINTRACK_DASHBOARD_CACHE', 'default')]
+
+
+def get_user_cache():
+    return caches[getattr(settings, 'FINTRACK_USER_CACHE', 'default')]
+
+
+def user_key(user_id):
+    return USER_KEY.format(user_id)
+
+
+def forget_users(user_ids):
+    """Drop cached ``CustomUser`` objects after their rows change.
+
+    The entries are dropped again on commit, in case a concurrent request
+    cached the old row before the change was committed.
+    """
+    keys = [user_key(user_id) for user_id in user_ids]
+    if keys:
+        get_user_cache().delete_many(keys)
+        transaction.on_commit(lambda: get_user_cache().delete_many(keys))
+
+
+def bump_data_version(user_ids):
+    """Invalidate every cached view of these users' data."""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        CustomUser.objects.filter(pk__in=user_ids).update(
+            data_version=F('data_version') + 1, data_modified_at=timezone.now(),
+        )
+        forget_users(user_ids)
+
+
+def dashboard_key(user, section):
+    # The date is part of the key because the 12-month window rolls over.
+    return f'finance:dashboard:{section}:{user.pk}:{user.data_version}:{date.today().isoformat()}'
+
+
+def dashboard_etag(user, section):
+    """ETag for a dashboard section, derived from when the user's data last changed."""
+    modified = user.data_modified_at.isoformat() if user.data_modified_at else '-'
+    seed = f'{section}:{user.pk}:{user.data_version}:{modified}:{date.today().isoformat()}'
+    return hashlib.sha1(seed.encode()).hexdigest()
+
+
+def _record(outcome):
+    cache = get_cache()
+    key = STATS_KEY.format(outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # First event since the counter expired or the cache was flushed.
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_or_build(user, section, build):
+    """Return ``(data, hit)`` for one dashboard section, calling ``build()`` on a miss."""
+    cache = get_cache()
+    key = dashboard_key(user, section)
+    data = cache.get(key)
+    if data is not None:
+        _record('hits')
+        logger.debug("dashboard %s cache hit for user %s", section, user.pk)
+        return data, True
+
+    data = build()
+    cache.set(key, data, timeout=getattr(settings, 'FINTRACK_DASHBOARD_CACHE_TIMEOUT', 3600))
+    _record('misses')
+    logger.debug("dashboard %s cache miss for user %s", section, user.pk)
+    return data, False
+
+
+async def _arecord(outcome):
+    cache = get_cache()
+    key = STATS_KEY.format(outcome)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 0, timeout=None)
+        await cache.aincr(key)
+
+
+async def aget_or_build(user, section, build):
+    """Async ``get_or_build``; ``build`` is a coroutine function."""
+    cache = get_cache()
+    key = dashboard_key(user, section)
+    data = await cache.aget(key)
+    if data is not None:
+        await _arecord('hits')
+        logger.debug("dashboard %s cache hit for user %s", section, user.pk)
+        return data, True
+
+    data = await build()
+    await cache.aset(key, data, timeout=getattr(settings, 'FINTRACK_DASHBOARD_CACHE_TIMEOUT', 3600))
+    await _arecord('misses')
+    logger.debug("dashboard %s cache miss for user %s", section, user.pk)
+    return data, False
+
+
+def dashboard_stats():
+    values = get_cache().get_many([STATS_KEY.format('hits'), STATS_KEY.format('misses')])
+    hits = values.get(STATS_KEY.format('hits'), 0)
+    misses = values.get(STATS_KEY.format('misses'), 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_rate': hits / total if total else 0.0}
+
+
+def reset_dashboard_stats():
+    get_cache().delete_many([STATS_KEY.format('hits'), STATS_KEY.format('misses')])
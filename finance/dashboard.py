@@ -0,0 +1,158 @@
+"""Dashboard data, split into independently cached sections.
+
+The dashboard page renders the ``summary`` section (totals and goal
+progress) itself; the charts fetch ``categories`` and ``monthly`` lazily from
+the JSON endpoints in ``finance.api``.
+"""
+import asyncio
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q, Sum
+
+from . import caching, forecasting, ledger
+from .models import ArchiveSnapshot, Goal, MonthlyRollup, UserBalance
+
+EXPENSE = Q(transaction_type='expense')
+
+
+def last_12_months(today=None):
+    """First day of each of the last 12 months, oldest first."""
+    today = today or date.today()
+    months = []
+    for offset in range(11, -1, -1):
+        total_months = today.year * 12 + today.month - 1 - offset
+        months.append(date(total_months // 12, total_months % 12 + 1, 1))
+    return months
+
+
+def _goals(user):
+    return Goal.objects.filter(user=user).select_related('forecast').order_by('deadline', 'pk')
+
+
+def _forecasts_stale(user, goals, today):
+    return any(getattr(goal, 'forecast', None) is None or not goal.forecast.is_current(user, today) for goal in goals)
+
+
+def _goal_progress(goals):
+    return [
+        {
+            'goal': goal,
+            'progress': goal.forecast.progress,
+            'allocated': goal.forecast.allocated,
+            'projected_completion': goal.forecast.projected_completion,
+            'on_track': goal.forecast.on_track,
+        }
+        for goal in goals
+    ]
+
+
+def goal_progress(user):
+    """Goals in allocation (deadline) order with their stored forecast.
+
+    Forecasts computed before the user's last write, or on an earlier day,
+    are recomputed for this user first.
+    """
+    today = date.today()
+    goals = list(_goals(user))
+    if _forecasts_stale(user, goals, today):
+        forecasting.forecast_users([user.pk], today=today)
+        goals = list(_goals(user))
+    return _goal_progress(goals)
+
+
+async def agoal_progress(user):
+    today = date.today()
+    goals = [goal async for goal in _goals(user)]
+    if _forecasts_stale(user, goals, today):
+        await sync_to_async(forecasting.forecast_users)([user.pk], today=today)
+        goals = [goal async for goal in _goals(user)]
+    return _goal_progress(goals)
+
+
+def _summary(balance, progress):
+    return {
+        'total_income': balance.total_income,
+        'total_expenses': balance.total_expenses,
+        'balance': balance.balance,
+        'goal_progress': progress,
+    }
+
+
+def build_summary(user):
+    return _summary(ledger.get_balance(user), goal_progress(user))
+
+
+async def _aget_balance(user):
+    return await UserBalance.objects.filter(pk=user.pk).afirst() or await sync_to_async(ledger.get_balance)(user)
+
+
+async def abuild_summary(user):
+    # The totals and the goals are independent, so they are fetched concurrently.
+    balance, progress = await asyncio.gather(_aget_balance(user), agoal_progress(user))
+    return _summary(balance, progress)
+
+
+def _expenses_by_category(model, user):
+    return (
+        model.objects
+        .filter(EXPENSE, user=user)
+        .values('category_id', 'category__name')
+        .annotate(total=Sum('total'))
+        .order_by('-total')
+    )
+
+
+def build_categories(user):
+    expense_by_category = list(_expenses_by_category(MonthlyRollup, user))
+    if user.archived_until:
+        merged = {entry['category_id']: entry for entry in expense_by_category}
+        for entry in _expenses_by_category(ArchiveSnapshot, user):
+            if entry['category_id'] in merged:
+                merged[entry['category_id']]['total'] += entry['total']
+            else:
+                merged[entry['category_id']] = entry
+        expense_by_category = sorted(merged.values(), key=lambda entry: entry['total'], reverse=True)
+    labels = [entry['category__name'] for entry in expense_by_category]
+    data = [float(entry['total']) for entry in expense_by_category]
+    return {
+        'labels': labels,
+        'data': data,
+        'top_category': labels[0] if labels else None,
+        'top_amount': data[0] if data else 0,
+    }
+
+
+def build_monthly(user):
+    # All twelve buckets come from one conditional aggregate bounded to the window.
+    months = last_12_months()
+    aggregates = MonthlyRollup.objects.filter(EXPENSE, user=user, month__gte=months[0]).aggregate(**{
+        f'month_{index}': Sum('total', filter=Q(month=month_date))
+        for index, month_date in enumerate(months)
+    })
+    return {
+        'labels': [month_date.strftime('%b %Y') for month_date in months],
+        'data': [float(aggregates[f'month_{index}'] or 0) for index in range(len(months))],
+    }
+
+
+SECTIONS = {
+    'summary': build_summary,
+    'categories': build_categories,
+    'monthly': build_monthly,
+}
+
+
+ASYNC_SECTIONS = {
+    'summary': abuild_summary,
+}
+
+
+def get_section(user, section):
+    """Return ``(data, hit)`` for one dashboard section, from cache when possible."""
+    return caching.get_or_build(user, section, lambda: SECTIONS[section](user))
+
+
+async def aget_section(user, section):
+    """Async ``get_section``, for the sections in ``ASYNC_SECTIONS``."""
+    return await caching.aget_or_build(user, section, lambda: ASYNC_SECTIONS[section](user))
@@ -0,0 +1,20 @@
+"""SQLite connection tuning.
+
+``configure_sqlite`` runs on ``connection_created`` and applies the
+``FINTRACK_SQLITE_PRAGMAS`` setting to every new SQLite connection. The
+production profile in ``finexp/settings.py`` turns on WAL, so readers no
+longer block the writer, and sets a busy timeout so that concurrent writers
+queue up instead of failing with "database is locked".
+"""
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'FINTRACK_SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
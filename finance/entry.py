@@ -0,0 +1,50 @@
+"""Creating many transactions in one request.
+
+The multi-row entry page (a ``TransactionFormSet``) and the JSON endpoint
+both validate every row with ``TransactionForm`` first and insert nothing
+unless all rows are valid. ``create_transactions`` then resolves all the
+category names at once and inserts the rows with a single ``bulk_create``
+in one atomic block, which updates the rollups, the ledger and the search
+index for the whole batch.
+"""
+from django.db import transaction
+
+from .forms import TransactionForm
+from .models import Category, Transaction
+
+MAX_JSON_ROWS = 1000
+JSON_FIELDS = ('title', 'amount', 'transaction_type', 'date', 'category')
+
+
+def create_transactions(user, forms):
+    """Insert the rows of valid ``TransactionForm``s for ``user``; returns the new transactions."""
+    with transaction.atomic():
+        categories = Category.objects.resolve(user, {form.cleaned_data['category'] for form in forms})
+        rows = []
+        for form in forms:
+            # ModelForm validation has already copied the other fields onto the instance.
+            row = form.instance
+            row.user = user
+            row.category = categories[Category.normalize(form.cleaned_data['category'])]
+            rows.append(row)
+        return Transaction.objects.bulk_create(rows)
+
+
+def json_forms(user, rows):
+    """A bound ``TransactionForm`` per JSON object in ``rows``."""
+    forms = []
+    for row in rows:
+        data = {}
+        if isinstance(row, dict):
+            data = {field: str(row[field]) for field in JSON_FIELDS if row.get(field) is not None}
+        forms.append(TransactionForm(data, user=user))
+    return forms
+
+
+def row_errors(forms):
+    """``[{'row': index, 'errors': {field: [message, ...]}}, ...]`` for the invalid forms."""
+    return [
+        {'row': index, 'errors': {field: list(messages) for field, messages in form.errors.items()}}
+        for index, form in enumerate(forms)
+        if not form.is_valid()
+    ]
@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 from django.contrib.auth import authenticate
-from .models import CustomUser, Transaction, Goal
+from .models import Category, CustomUser, Transaction, Goal
 from datetime import date
 
 class CustomUserCreationForm(UserCreationForm):
@@ -16,17 +16,132 @@ class CustomUserCreationForm(UserCreationForm):
         fields = ('username', 'email', 'first_name', 'last_name', 'phone_number', 'date_of_birth', 'bio', 'password1', 'password2')
         
 class TransactionForm(forms.ModelForm):
+    DEFAULT_CATEGORIES = [
+        'Food', 'Housing & Utilities', 'Transportation', 'Groceries', 'Personal & Health',
+        'Education & Learning', 'Entertainment & Leisure', 'Debt & Financial Obligations',
+        'Savings & Investments', 'Miscellaneous',
+    ]
+
+    category = forms.CharField(max_length=255, widget=forms.TextInput(attrs={
+        'class': 'form-input', 'list': 'category-options', 'autocomplete': 'off',
+    }))
+
     class Meta:
         model = Transaction
-        fields = ['title', 'amount', 'transaction_type', 'date', 'category']
+        fields = ['title', 'amount', 'transaction_type', 'date']
         widgets = {
             'title': forms.TextInput(attrs={'class': 'form-input'}),
             'amount': forms.NumberInput(attrs={'class': 'form-input', 'step': '0.01'}),
             'transaction_type': forms.Select(attrs={'class': 'form-input'}),
             'date': forms.DateInput(attrs={'class': 'form-input', 'type': 'date'}),
-            'category': forms.TextInput(attrs={'class': 'form-input'}),
         }
 
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+        if self.instance.category_id:
+            self.initial.setdefault('category', self.instance.category.name)
+
+    def category_suggestions(self):
+        """The user's own categories first, then the defaults they have not used yet."""
+        names = list(Category.objects.filter(user=self.user).values_list('name', flat=True)) if self.user else []
+        used = {Category.normalize(name) for name in names}
+        return names + [name for name in self.DEFAULT_CATEGORIES if Category.normalize(name) not in used]
+
+    def clean_category(self):
+        name = Category.clean_name(self.cleaned_data['category'])
+        if not name:
+            raise forms.ValidationError('This field is required.')
+        return name
+
+    def save(self, commit=True):
+        self.instance.category = Category.objects.for_name(self.user, self.cleaned_data['category'])
+        return super().save(commit=commit)
+
+
+# Multi-row entry (finance.entry); blank rows are ignored.
+TransactionFormSet = forms.formset_factory(
+    TransactionForm, extra=10, min_num=1, validate_min=True, max_num=100, validate_max=True, absolute_max=100,
+)
+
+
+class TransactionFilterForm(forms.Form):
+    TYPE_CHOICES = [('', 'All types')] + Transaction.TRANSACTION_TYPES
+
+    q = forms.CharField(required=False, max_length=100, strip=True,
+                        widget=forms.TextInput(attrs={'class': 'form-input', 'type': 'search',
+                                                      'placeholder': 'Search title or category'}))
+    date_from = forms.DateField(required=False, widget=forms.DateInput(attrs={'class': 'form-input', 'type': 'date'}))
+    date_to = forms.DateField(required=False, widget=forms.DateInput(attrs={'class': 'form-input', 'type': 'date'}))
+    transaction_type = forms.ChoiceField(required=False, choices=TYPE_CHOICES, widget=forms.Select(attrs={'class': 'form-input'}))
+    category = forms.ModelChoiceField(required=False, queryset=Category.objects.none(), empty_label='All categories',
+                                      widget=forms.Select(attrs={'class': 'form-input'}))
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if user is not None:
+            self.fields['category'].queryset = Category.objects.filter(user=user)
+
+    @property
+    def search_text(self):
+        """The search box contents, or ``''``; applied by ``finance.search``, not by ``filter``."""
+        return self.cleaned_data.get('q', '') if self.is_valid() else ''
+
+    def filter(self, queryset):
+        """Apply the valid filters to a ``Transaction`` or ``ArchivedTransaction`` queryset."""
+        if not self.is_valid():
+            return queryset
+        data = self.cleaned_data
+        if data['date_from']:
+            queryset = queryset.filter(date__gte=data['date_from'])
+        if data['date_to']:
+            queryset = queryset.filter(date__lte=data['date_to'])
+        if data['transaction_type']:
+            queryset = queryset.filter(transaction_type=data['transaction_type'])
+        if data['category']:
+            queryset = queryset.filter(category_id=data['category'].pk)
+        return queryset
+
+
+class AnalyticsQueryForm(forms.Form):
+    """Parameters of an ``/api/analytics`` query (see ``finance.analytics``).
+
+    ``start`` defaults to the first day of the month a year before ``end``,
+    which defaults to today.
+    """
+    GRAINS = ['day', 'week', 'month', 'quarter', 'year']
+    DIMENSIONS = ['category', 'type']
+    MEASURES = ['sum', 'count', 'avg']
+
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+    grain = forms.ChoiceField(required=False, choices=[(grain, grain) for grain in GRAINS])
+    group_by = forms.MultipleChoiceField(required=False, choices=[(name, name) for name in DIMENSIONS])
+    measures = forms.MultipleChoiceField(required=False, choices=[(name, name) for name in MEASURES])
+
+    def clean(self):
+        data = super().clean()
+        end = data.get('end') or date.today()
+        start = data.get('start') or date(end.year - 1, end.month, 1)
+        if start > end:
+            raise forms.ValidationError('The start date must not be after the end date.')
+        # Canonical order, so equivalent queries share a cache entry.
+        return {
+            'start': start,
+            'end': end,
+            'grain': data.get('grain') or 'month',
+            'group_by': [name for name in self.DIMENSIONS if name in data.get('group_by', [])],
+            'measures': [name for name in self.MEASURES if name in data.get('measures', [])] or ['sum'],
+        }
+
+
+class TransactionImportForm(forms.Form):
+    FORMAT_CHOICES = [('', 'Detect from file name'), ('csv', 'CSV'), ('ofx', 'OFX / QFX')]
+
+    file = forms.FileField(widget=forms.ClearableFileInput(attrs={'class': 'form-input', 'accept': '.csv,.ofx,.qfx'}))
+    file_format = forms.ChoiceField(required=False, choices=FORMAT_CHOICES, widget=forms.Select(attrs={'class': 'form-input'}))
+
+
 class GoalForm(forms.ModelForm):
     class Meta:
         model = Goal
@@ -0,0 +1,307 @@
+"""Bulk transaction import from CSV and OFX bank statements.
+
+Files are parsed as a stream and validated in fixed-size batches. Each
+accepted row gets a content hash stored in ``Transaction.import_hash``;
+rows whose hash the user already has, live or archived, are skipped, so
+uploading the same statement twice does not create duplicates.
+"""
+import csv
+import hashlib
+import io
+import re
+import time
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from .models import ArchivedTransaction, Category, Transaction
+
+BATCH_SIZE = 1000
+MAX_REPORTED_REJECTS = 100
+DEFAULT_CATEGORY = 'Uncategorized'
+# Tried in order for binary uploads. Banks often export cp1252 or latin-1;
+# latin-1 decodes any byte, so the last attempt cannot fail to decode.
+ENCODINGS = ('utf-8-sig', 'cp1252', 'latin-1')
+
+# Accepted CSV header spellings, mapped to Transaction fields.
+CSV_COLUMNS = {
+    'date': 'date',
+    'posted': 'date',
+    'title': 'title',
+    'description': 'title',
+    'name': 'title',
+    'memo': 'title',
+    'amount': 'amount',
+    'transaction_type': 'transaction_type',
+    'type': 'transaction_type',
+    'category': 'category',
+}
+DATE_FORMATS = ('%Y-%m-%d', '%Y%m%d', '%d/%m/%Y', '%d.%m.%Y')
+TRANSACTION_TYPES = {value for value, _ in Transaction.TRANSACTION_TYPES}
+TYPE_ALIASES = {'credit': 'income', 'debit': 'expense'}
+TITLE_MAX_LENGTH = Transaction._meta.get_field('title').max_length
+CATEGORY_MAX_LENGTH = Category._meta.get_field('name').max_length
+AMOUNT_LIMIT = Decimal(10) ** (
+    Transaction._meta.get_field('amount').max_digits - Transaction._meta.get_field('amount').decimal_places
+)
+
+
+class ImportReport:
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.rejects = []
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def reject(self, line, errors):
+        self.rejected += 1
+        if len(self.rejects) < MAX_REPORTED_REJECTS:
+            self.rejects.append((line, errors))
+
+    def summary(self):
+        return (
+            f"{self.total} rows in {self.elapsed:.2f}s ({self.rows_per_sec:.0f} rows/sec): "
+            f"{self.created} imported, {self.duplicates} duplicates skipped, {self.rejected} rejected"
+        )
+
+
+def open_text(fileobj, encoding=ENCODINGS[0]):
+    """Wrap a binary upload for text parsing; the default tolerates a UTF-8 BOM."""
+    if isinstance(fileobj, io.TextIOBase):
+        return fileobj
+    return io.TextIOWrapper(getattr(fileobj, 'file', fileobj), encoding=encoding, newline='')
+
+
+def parse_csv(fileobj):
+    """Yield ``(line_number, row)`` pairs with keys normalised to Transaction fields."""
+    reader = csv.DictReader(open_text(fileobj))
+    for row in reader:
+        normalised = {}
+        for key, value in row.items():
+            field = CSV_COLUMNS.get((key or '').strip().lower())
+            if field and field not in normalised:
+                normalised[field] = (value or '').strip()
+        yield reader.line_num, normalised
+
+
+_OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+
+def parse_ofx(fileobj, read_size=64 * 1024):
+    """Yield ``(index, row)`` pairs for each ``<STMTTRN>`` in an OFX (SGML or XML) statement."""
+    text = open_text(fileobj)
+    pending = ''
+    current = None
+    index = 0
+    while True:
+        chunk = text.read(read_size)
+        pending += chunk
+        # Only scan up to the last complete tag; the rest waits for the next chunk.
+        cut = len(pending) if not chunk else max(pending.rfind('<'), 0)
+        for closing, tag, value in _OFX_TAG.findall(pending[:cut]):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if closing and current is not None:
+                    index += 1
+                    yield index, _ofx_row(current)
+                    current = None
+                elif not closing:
+                    current = {}
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+        pending = pending[cut:]
+        if not chunk:
+            break
+
+
+def _ofx_row(fields):
+    return {
+        'date': fields.get('DTPOSTED', '')[:8],
+        'title': fields.get('NAME') or fields.get('MEMO') or '',
+        'amount': fields.get('TRNAMT', ''),
+        'transaction_type': '',
+        'category': '',
+        'fitid': fields.get('FITID', ''),
+    }
+
+
+def _parse_date(value):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def clean_row(row):
+    """Validate one parsed row; returns ``(cleaned, errors)``."""
+    errors = []
+
+    day = _parse_date(row.get('date', ''))
+    if day is None:
+        errors.append(f"invalid date {row.get('date', '')!r}")
+
+    raw_amount = row.get('amount', '').replace(',', '')
+    try:
+        amount = Decimal(raw_amount)
+        if not amount.is_finite():  # NaN and Infinity parse but cannot be compared or stored
+            raise InvalidOperation
+        amount = amount.quantize(Decimal('0.01'))
+    except InvalidOperation:
+        amount = None
+        errors.append(f"invalid amount {row.get('amount', '')!r}")
+
+    transaction_type = row.get('transaction_type', '').lower()
+    transaction_type = TYPE_ALIASES.get(transaction_type, transaction_type)
+    if amount is not None:
+        if not transaction_type:
+            # Bank statements carry the direction in the sign.
+            transaction_type = 'expense' if amount < 0 else 'income'
+        amount = abs(amount)
+        if amount >= AMOUNT_LIMIT:
+            errors.append(f"amount {amount} is too large")
+    if transaction_type not in TRANSACTION_TYPES:
+        errors.append(f"invalid transaction type {row.get('transaction_type', '')!r}")
+
+    title = row.get('title', '')
+    if not title:
+        errors.append("missing title")
+    elif len(title) > TITLE_MAX_LENGTH:
+        errors.append(f"title longer than {TITLE_MAX_LENGTH} characters")
+
+    category = Category.clean_name(row.get('category', '')) or DEFAULT_CATEGORY
+    if len(category) > CATEGORY_MAX_LENGTH:
+        errors.append(f"category longer than {CATEGORY_MAX_LENGTH} characters")
+
+    if errors:
+        return None, errors
+    return {
+        'date': day,
+        'title': title,
+        'amount': amount,
+        'transaction_type': transaction_type,
+        'category': category,
+        'fitid': row.get('fitid', ''),
+    }, []
+
+
+def content_hash(cleaned, occurrence):
+    """Stable identity for an imported row.
+
+    OFX rows carry the bank's own transaction id. Otherwise the row content is
+    hashed together with how many identical rows preceded it in the file, so
+    two genuine same-day coffees stay distinct but a re-upload maps onto the
+    same hashes.
+    """
+    if cleaned['fitid']:
+        key = f"ofx|{cleaned['fitid']}"
+    else:
+        key = '|'.join([
+            cleaned['date'].isoformat(), str(cleaned['amount']), cleaned['transaction_type'],
+            Category.normalize(cleaned['category']), cleaned['title'].casefold(), str(occurrence),
+        ])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_rows(user, rows, batch_size=BATCH_SIZE):
+    """Validate and insert parsed ``(line, row)`` pairs for ``user`` in one transaction."""
+    report = ImportReport()
+    occurrences = Counter()
+    started = time.perf_counter()
+
+    with transaction.atomic():
+        for batch in _batches(rows, batch_size):
+            pending = {}
+            for line, row in batch:
+                report.total += 1
+                cleaned, errors = clean_row(row)
+                if errors:
+                    report.reject(line, errors)
+                    continue
+                identity = (
+                    cleaned['fitid'] or
+                    (cleaned['date'], cleaned['amount'], cleaned['transaction_type'],
+                     Category.normalize(cleaned['category']), cleaned['title'].casefold())
+                )
+                digest = content_hash(cleaned, occurrences[identity])
+                occurrences[identity] += 1
+                if digest in pending:
+                    report.duplicates += 1
+                    continue
+                pending[digest] = cleaned
+
+            existing = set(
+                Transaction.objects
+                .filter(user=user, import_hash__in=list(pending))
+                .values_list('import_hash', flat=True)
+            )
+            # Archiving moves rows, hashes included, into ArchivedTransaction
+            # (possibly in the archive database); those were imported too.
+            existing.update(
+                ArchivedTransaction.objects
+                .filter(user_id=user.pk, import_hash__in=[digest for digest in pending if digest not in existing])
+                .values_list('import_hash', flat=True)
+            )
+            report.duplicates += len(existing)
+            categories = Category.objects.resolve(
+                user, {cleaned['category'] for digest, cleaned in pending.items() if digest not in existing},
+            )
+            new_rows = [
+                Transaction(
+                    user=user,
+                    title=cleaned['title'],
+                    amount=cleaned['amount'],
+                    transaction_type=cleaned['transaction_type'],
+                    date=cleaned['date'],
+                    category=categories[Category.normalize(cleaned['category'])],
+                    import_hash=digest,
+                )
+                for digest, cleaned in pending.items()
+                if digest not in existing
+            ]
+            Transaction.objects.bulk_create(new_rows, batch_size=batch_size)
+            report.created += len(new_rows)
+
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def detect_format(name):
+    return 'ofx' if name.lower().endswith(('.ofx', '.qfx')) else 'csv'
+
+
+def import_file(user, fileobj, file_format=None, batch_size=BATCH_SIZE):
+    file_format = file_format or detect_format(getattr(fileobj, 'name', '') or '')
+    parser = parse_ofx if file_format == 'ofx' else parse_csv
+    if isinstance(fileobj, io.TextIOBase):
+        return import_rows(user, parser(fileobj), batch_size=batch_size)
+    for encoding in ENCODINGS:
+        fileobj.seek(0)
+        text = open_text(fileobj, encoding)
+        try:
+            return import_rows(user, parser(text), batch_size=batch_size)
+        except UnicodeDecodeError:
+            # The import is one transaction, so nothing was saved; read it again.
+            continue
+        finally:
+            text.detach()  # leave the upload open for the next attempt
@@ -0,0 +1,165 @@
+"""Per-request SQL and render timing.
+
+``ServerTimingMiddleware`` wraps every database connection with an
+``execute_wrapper`` for the duration of the request and records the query
+count, total SQL time and slowest statement. ``InstrumentedDjangoTemplates``
+(set as the template ``BACKEND``) adds template render time. The totals go
+out in a ``Server-Timing`` header; requests slower than
+``FINTRACK_SLOW_REQUEST_MS`` and statements repeated at least
+``FINTRACK_REPEATED_QUERY_THRESHOLD`` times (the N+1 pattern) are logged to
+``finance.performance`` as JSON.
+
+The bookkeeping is a ``perf_counter`` call and a dict increment per query,
+cheap enough to leave on in production. Queries issued while a streaming
+response is consumed happen after the middleware returns and are not counted.
+"""
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger('finance.performance')
+
+_current = ContextVar('finance_request_profile', default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.slowest_sql = None
+        self.slowest_time = 0.0
+        self.template_time = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.query_count += 1
+            self.sql_time += elapsed
+            self.statements[sql] += 1
+            if elapsed > self.slowest_time:
+                self.slowest_time = elapsed
+                self.slowest_sql = sql
+
+    def repeated(self, threshold):
+        """Statements (with placeholders, so parameters do not matter) run ``threshold`` times or more."""
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+def current_profile():
+    """The profile of the request being handled on this thread/task, if any."""
+    return _current.get()
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        profile = _current.get()
+        if profile is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            profile.template_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """``DjangoTemplates`` whose top-level renders count towards the request profile."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class ServerTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.emit_header = getattr(settings, 'FINTRACK_SERVER_TIMING', True)
+        self.slow_ms = getattr(settings, 'FINTRACK_SLOW_REQUEST_MS', 500)
+        self.repeat_threshold = getattr(settings, 'FINTRACK_REPEATED_QUERY_THRESHOLD', 5)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+        try:
+            with self.wrap_connections(profile):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+        # The async ORM runs queries on the request's thread-sensitive executor
+        # thread, which has its own connection objects; wrap those.
+        wrappers = await sync_to_async(self.wrap_connections)(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrappers.close)()
+            _current.reset(token)
+        return self.finish(request, response, profile, time.perf_counter() - started)
+
+    def wrap_connections(self, profile):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(profile))
+        return stack
+
+    def finish(self, request, response, profile, total):
+        if self.emit_header:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={_ms(profile.sql_time)};desc="{profile.query_count} queries"',
+                f'tpl;dur={_ms(profile.template_time)}',
+                f'total;dur={_ms(total)}',
+            ])
+
+        repeated = profile.repeated(self.repeat_threshold)
+        if repeated or _ms(total) >= self.slow_ms:
+            self.log(request, response, profile, total, repeated)
+        return response
+
+    def log(self, request, response, profile, total, repeated):
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': _ms(total),
+            'sql_ms': _ms(profile.sql_time),
+            'queries': profile.query_count,
+            'template_ms': _ms(profile.template_time),
+            'slowest_sql': profile.slowest_sql,
+            'slowest_sql_ms': _ms(profile.slowest_time),
+            'repeated': [{'sql': sql, 'count': count} for sql, count in repeated],
+        }
+        message = 'repeated query' if repeated and _ms(total) < self.slow_ms else 'slow request'
+        logger.warning('%s %s', message, json.dumps(record), extra={'request_profile': record})
@@ -0,0 +1,180 @@
+"""Background report jobs, run by the ``run_workers`` command.
+
+A large export is recorded as a queued ``ReportJob`` instead of being
+generated inside the request. Worker processes claim jobs from the table,
+write the file to ``MEDIA_ROOT/reports/<user id>/`` through the default
+storage and mark the job done; the browser polls the report list and
+downloads the result from there.
+
+Claiming is a single conditional ``UPDATE``: it only succeeds while the job
+is still queued and its owner has fewer than ``FINTRACK_REPORT_JOBS_PER_USER``
+jobs running. SQLite executes the statement under its write lock, so two
+workers can never take the same job, and one user's exports cannot occupy
+every worker while other users wait. A worker that dies leaves its job
+running; after ``FINTRACK_REPORT_JOB_TIMEOUT`` seconds an idle worker puts it
+back in the queue, up to ``MAX_ATTEMPTS`` tries.
+"""
+import logging
+import os
+import socket
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, connections
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from . import exports
+from .forms import TransactionFilterForm
+from .models import ReportJob, Transaction
+
+logger = logging.getLogger(__name__)
+
+# Request parameters an export job keeps; the rest of the query string is dropped.
+PARAMS = ('date_from', 'date_to', 'transaction_type', 'category', 'include_archived')
+# Queued plus running jobs one user may have at a time.
+MAX_PENDING_PER_USER = 10
+MAX_ATTEMPTS = 3
+STALE_CHECK_SECONDS = 60
+
+
+class QueueFull(Exception):
+    pass
+
+
+def export_params(query):
+    """The export filters from request data, with stable key order."""
+    return {key: query[key] for key in sorted(query) if key in PARAMS and query[key]}
+
+
+def enqueue(user, fmt, params):
+    """Queue an export for ``user``, or return their identical pending one.
+
+    Raises ``QueueFull`` when the user already has ``MAX_PENDING_PER_USER``
+    pending jobs.
+    """
+    pending = ReportJob.objects.filter(user=user, status__in=[ReportJob.QUEUED, ReportJob.RUNNING])
+    existing = pending.filter(format=fmt, params=params).first()
+    if existing is not None:
+        return existing
+    if pending.count() >= MAX_PENDING_PER_USER:
+        raise QueueFull
+    return ReportJob.objects.create(user=user, format=fmt, params=params)
+
+
+def _claimable(limit):
+    running = (
+        ReportJob.objects.filter(user=OuterRef('user'), status=ReportJob.RUNNING)
+        .order_by().values('user').annotate(count=Count('pk')).values('count')
+    )
+    return (
+        ReportJob.objects.filter(status=ReportJob.QUEUED)
+        .alias(running=Coalesce(Subquery(running), Value(0)))
+        .filter(running__lt=limit)
+    )
+
+
+def claim(worker, limit=None):
+    """Take the oldest job whose owner is below the running limit; ``None`` if there is none."""
+    limit = settings.FINTRACK_REPORT_JOBS_PER_USER if limit is None else limit
+    while True:
+        candidate = _claimable(limit).order_by('created_at', 'pk').values_list('pk', flat=True).first()
+        if candidate is None:
+            return None
+        # The UPDATE re-checks both conditions; losing a race to another
+        # worker just means trying the next candidate.
+        claimed = _claimable(limit).filter(pk=candidate).update(
+            status=ReportJob.RUNNING, worker=worker, started_at=timezone.now(), attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return ReportJob.objects.select_related('user').get(pk=candidate)
+
+
+def requeue_stale(timeout=None):
+    """Return jobs whose worker stopped reporting to the queue; returns how many were touched."""
+    timeout = settings.FINTRACK_REPORT_JOB_TIMEOUT if timeout is None else timeout
+    stale = ReportJob.objects.filter(
+        status=ReportJob.RUNNING, started_at__lt=timezone.now() - timedelta(seconds=timeout),
+    )
+    failed = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=ReportJob.FAILED, error='The report took too long to generate.', finished_at=timezone.now(),
+    )
+    return failed + stale.update(status=ReportJob.QUEUED, worker='')
+
+
+def querysets(job):
+    """``(transactions, archived)`` for the job, filtered as the list was when it was queued."""
+    user = job.user
+    filter_form = TransactionFilterForm(job.params, user=user)
+    transactions = filter_form.filter(Transaction.objects.filter(user=user))
+    archived = None
+    if job.params.get('include_archived') == '1':
+        archived = exports.archived_transactions(user, filter_form)
+    return transactions, archived
+
+
+def generate(job, fileobj):
+    transactions, archived = querysets(job)
+    if job.format == 'csv':
+        for chunk in exports.iter_csv(transactions, archived=archived):
+            fileobj.write(chunk.encode())
+    else:
+        exports.write_xlsx(transactions, fileobj, archived=archived)
+
+
+def run(job):
+    """Generate a claimed job's file and record the outcome."""
+    try:
+        with tempfile.TemporaryFile() as spool:
+            generate(job, spool)
+            spool.seek(0)
+            # The random part keeps the file name unguessable where MEDIA_URL is served.
+            job.output.save(f'{job.pk}-{get_random_string(16)}-{job.filename}', File(spool), save=False)
+    except Exception as exc:
+        logger.exception("Report job %s failed", job.pk)
+        ReportJob.objects.filter(pk=job.pk).update(
+            status=ReportJob.FAILED, error=str(exc)[:1000], finished_at=timezone.now(),
+        )
+        return False
+    ReportJob.objects.filter(pk=job.pk).update(
+        status=ReportJob.DONE, output=job.output.name, error='', finished_at=timezone.now(),
+    )
+    return True
+
+
+def work(drain=False, poll_interval=None, index=0):
+    """Claim and run jobs until stopped, or with ``drain`` until none can be claimed.
+
+    Returns the number of jobs this worker ran.
+    """
+    poll_interval = settings.FINTRACK_REPORT_POLL_INTERVAL if poll_interval is None else poll_interval
+    worker = f'{socket.gethostname()}:{os.getpid()}:{index}'
+    done, checked_at = 0, 0.0
+    while True:
+        close_old_connections()
+        job = claim(worker)
+        if job is not None:
+            run(job)
+            done += 1
+            continue
+        if time.monotonic() - checked_at >= STALE_CHECK_SECONDS:
+            requeue_stale()
+            checked_at = time.monotonic()
+        if drain:
+            return done
+        time.sleep(poll_interval)
+
+
+def run_pool(workers, drain=False, poll_interval=None):
+    """Run ``work`` in ``workers`` processes; returns the jobs each one ran."""
+    import multiprocessing
+
+    connections.close_all()  # children must open their own connections
+    context = multiprocessing.get_context('fork')
+    with context.Pool(workers) as pool:
+        return pool.starmap(work, [(drain, poll_interval, index) for index in range(workers)])
@@ -0,0 +1,125 @@
+"""Maintenance of the per-user ``UserBalance`` ledger summary.
+
+Every change to ``MonthlyRollup`` or ``ArchiveSnapshot`` passes the same
+signed amounts to ``adjust``, which applies them with ``F()`` expressions so
+concurrent writers add up instead of overwriting each other. The stored row
+therefore always equals rollups plus snapshots, and the dashboard reads the
+balance with one primary-key lookup. ``verify`` and ``rebuild`` compare
+against and recompute from the transactions themselves.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import ArchiveSnapshot, Transaction, UserBalance
+
+
+def delta(transaction_type, amount, count):
+    """``(income, expenses, count)`` change for ``amount`` of one transaction type."""
+    if transaction_type == 'income':
+        return amount, 0, count
+    return 0, amount, count
+
+
+def adjust(deltas):
+    """Apply ``{user_id: (income, expenses, count)}`` changes to the ledger rows."""
+    for user_id, (income, expenses, count) in deltas.items():
+        if not (income or expenses or count):
+            continue
+        changes = {
+            'total_income': F('total_income') + income,
+            'total_expenses': F('total_expenses') + expenses,
+            'transaction_count': F('transaction_count') + count,
+            'modified_at': timezone.now(),
+        }
+        row = UserBalance.objects.filter(pk=user_id)
+        if not row.update(**changes):
+            try:
+                with transaction.atomic():
+                    UserBalance.objects.create(
+                        user_id=user_id, total_income=income, total_expenses=expenses, transaction_count=count,
+                    )
+            except IntegrityError:
+                # A concurrent writer created the row first.
+                row.update(**changes)
+
+
+def add(deltas, user_id, transaction_type, amount, count):
+    """Accumulate one change into a ``defaultdict`` of deltas for ``adjust``."""
+    income, expenses, count = delta(transaction_type, amount, count)
+    current = deltas[user_id]
+    deltas[user_id] = (current[0] + income, current[1] + expenses, current[2] + count)
+
+
+def new_deltas():
+    return defaultdict(lambda: (0, 0, 0))
+
+
+def expected(user_ids):
+    """``{user_id: (income, expenses, count)}`` recomputed from transactions and archive snapshots."""
+    totals = {user_id: (Decimal(0), Decimal(0), 0) for user_id in user_ids}
+    live = (
+        Transaction.objects.filter(user_id__in=user_ids).order_by()
+        .values_list('user_id', 'transaction_type')
+        .annotate(total=Sum('amount'), count=Count('id'))
+    )
+    archived = (
+        ArchiveSnapshot.objects.filter(user_id__in=user_ids).order_by()
+        .values_list('user_id', 'transaction_type')
+        .annotate(total=Sum('total'), count=Sum('count'))
+    )
+    for rows in (live, archived):
+        for user_id, transaction_type, total, count in rows:
+            income, expenses, _ = delta(transaction_type, total, count)
+            current = totals[user_id]
+            totals[user_id] = (current[0] + income, current[1] + expenses, current[2] + count)
+    return totals
+
+
+def _stored(user_ids):
+    return {
+        row[0]: row[1:]
+        for row in UserBalance.objects.filter(pk__in=user_ids)
+        .values_list('user_id', 'total_income', 'total_expenses', 'transaction_count')
+    }
+
+
+def verify(user_ids):
+    """Return ``(user_id, stored, expected)`` for every user whose ledger row has drifted.
+
+    ``stored`` is ``None`` when the row is missing. Users who never had a
+    transaction have no row, so a missing row only counts as drift when the
+    expected totals are not zero.
+    """
+    stored = _stored(user_ids)
+    empty = (Decimal(0), Decimal(0), 0)
+    return [
+        (user_id, stored.get(user_id), totals)
+        for user_id, totals in sorted(expected(user_ids).items())
+        if stored.get(user_id, empty) != totals
+    ]
+
+
+def rebuild(user_ids):
+    """Recompute and store the ledger rows of ``user_ids``; returns the new rows."""
+    now = timezone.now()
+    rows = [
+        UserBalance(user_id=user_id, total_income=income, total_expenses=expenses,
+                    transaction_count=count, modified_at=now)
+        for user_id, (income, expenses, count) in expected(user_ids).items()
+    ]
+    UserBalance.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['total_income', 'total_expenses', 'transaction_count', 'modified_at'],
+    )
+    return rows
+
+
+def get_balance(user):
+    """The user's ledger row, rebuilt if it does not exist yet."""
+    return UserBalance.objects.filter(pk=user.pk).first() or rebuild([user.pk])[0]
@@ -0,0 +1,42 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import archive
+from finance.models import Transaction
+
+
+class Command(BaseCommand):
+    help = "Move transactions older than the archive horizon into cold storage."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon-years', type=int, default=None,
+                            help="Complete years to keep live besides the current one "
+                                 "(default: FINTRACK_ARCHIVE_HORIZON_YEARS).")
+        parser.add_argument('--before', type=int, metavar='YEAR',
+                            help="Archive every transaction dated before 1 January of YEAR instead.")
+        parser.add_argument('--user', type=int, action='append', dest='users', metavar='USER_ID',
+                            help="Only archive this user's transactions (repeatable).")
+        parser.add_argument('--batch-size', type=int, default=archive.BATCH_SIZE,
+                            help="Transactions moved per transaction.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report how many transactions would be archived without moving them.")
+
+    def handle(self, *args, **options):
+        try:
+            if options['before'] is not None:
+                cutoff = date(options['before'], 1, 1)
+            else:
+                cutoff = archive.horizon_cutoff(options['horizon_years'])
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        if options['dry_run']:
+            candidates = Transaction.objects.filter(date__lt=cutoff)
+            if options['users']:
+                candidates = candidates.filter(user_id__in=options['users'])
+            self.stdout.write(f"{candidates.count()} transactions dated before {cutoff} would be archived")
+            return
+
+        report = archive.archive_before(cutoff, user_ids=options['users'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(report.summary()))
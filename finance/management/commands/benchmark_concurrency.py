@@ -0,0 +1,28 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import benchmarking
+from finance.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Measure read/write throughput with several worker processes sharing the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default=f'{benchmarking.DEFAULT_PREFIX}00000')
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10.0, help="Seconds to run.")
+        parser.add_argument('--write-share', type=float, default=0.2,
+                            help="Fraction of requests that add a transaction; the rest list transactions.")
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(username=options['user'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Unknown user: {options['user']}; run seed_benchmark first.")
+
+        result = benchmarking.run_concurrency(
+            user, workers=options['workers'], duration=options['duration'], write_share=options['write_share'],
+        )
+        self.stdout.write(json.dumps(result, indent=2))
@@ -0,0 +1,24 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import benchmarking
+from finance.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Compare adding transactions one form at a time with the multi-row page and the JSON endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default=f'{benchmarking.DEFAULT_PREFIX}00000')
+        parser.add_argument('--rows', type=int, default=200)
+        parser.add_argument('--batch-size', type=int, default=20, help="Rows per multi-row or JSON request.")
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(username=options['user'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Unknown user: {options['user']}; run seed_benchmark first.")
+
+        result = benchmarking.run_entry(user, rows=options['rows'], batch_size=options['batch_size'])
+        self.stdout.write(json.dumps(result, indent=2))
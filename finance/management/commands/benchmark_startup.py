@@ -0,0 +1,26 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import benchmarking
+
+
+class Command(BaseCommand):
+    help = "Measure how long a fresh worker takes to load the WSGI application, and its memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--budget-ms', type=float, default=benchmarking.STARTUP_BUDGET_MS,
+                            help="Allowed median time until a worker is ready for its first request.")
+        parser.add_argument('--budget-rss-mb', type=float, default=benchmarking.STARTUP_BUDGET_RSS_MB,
+                            help="Allowed peak resident memory of a freshly started worker.")
+
+    def handle(self, *args, **options):
+        result = benchmarking.run_startup(runs=options['runs'])
+        self.stdout.write(json.dumps(result, indent=2))
+        problems = benchmarking.check_startup(result, options['budget_ms'], options['budget_rss_mb'])
+        for problem in problems:
+            self.stderr.write(f"OVER BUDGET: {problem}")
+        if problems:
+            raise CommandError(f"{len(problems)} startup budget(s) exceeded")
+        self.stdout.write(self.style.SUCCESS("Startup within budget"))
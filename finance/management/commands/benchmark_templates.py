@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import benchmarking
+from finance.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Time rendering the transaction list per 1,000 rows with and without template caching."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default=f'{benchmarking.DEFAULT_PREFIX}00000')
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(username=options['user'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Unknown user: {options['user']}; run seed_benchmark first.")
+
+        try:
+            result = benchmarking.run_templates(user, rows=options['rows'], iterations=options['iterations'])
+        except ValueError as exc:
+            raise CommandError(exc)
+        self.stdout.write(json.dumps(result, indent=2))
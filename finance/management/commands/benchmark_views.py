@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import benchmarking
+from finance.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Measure latency, SQL and memory for every finance route; optionally gate on a baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default=f'{benchmarking.DEFAULT_PREFIX}00000',
+                            help="Username to log in as (staff, to include the admin dashboard).")
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--route', dest='routes', action='append', default=[],
+                            choices=[name for name, _, _ in benchmarking.ROUTES],
+                            help="Limit to this route (repeatable).")
+        parser.add_argument('--cold', action='store_true', help="Clear the dashboard cache before every request.")
+        parser.add_argument('--output', help="Write the JSON results to this file instead of stdout.")
+        parser.add_argument('--compare', metavar='BASELINE', help="JSON results of an earlier run to compare against.")
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help="Allowed p95 slowdown against the baseline, as a fraction.")
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(username=options['user'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Unknown user: {options['user']}; run seed_benchmark first.")
+
+        results = benchmarking.run(
+            user, iterations=options['iterations'], warmup=options['warmup'],
+            routes=options['routes'], cold=options['cold'],
+        )
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(output + '\n')
+            for name, result in results['routes'].items():
+                self.stdout.write(
+                    f"{name:24} {result['status']}  p50 {result['p50_ms']:8.1f}ms  p95 {result['p95_ms']:8.1f}ms  "
+                    f"{result['queries']:3} queries {result['sql_ms']:7.1f}ms  peak {result['peak_memory_kb']:8.0f}KB"
+                )
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            regressions = benchmarking.compare(results, benchmarking.load(options['compare']), options['threshold'])
+            for name, message in regressions:
+                self.stderr.write(f"REGRESSION {name}: {message}")
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['compare']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}"))
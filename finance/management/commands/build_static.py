@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from finance import assets
+
+
+class Command(BaseCommand):
+    help = "Resize the logos, collect static files (hashed names in production) and precompress them."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logos-only', action='store_true',
+                            help="Only regenerate the resized logos in the source static directory.")
+
+    def handle(self, *args, **options):
+        source = settings.STATICFILES_DIRS[0]
+        for path, size in assets.build_logos(source):
+            self.stdout.write(f"{path.relative_to(source)}: {size / 1024:.1f} KB")
+        if options['logos_only']:
+            return
+
+        call_command('collectstatic', interactive=False, verbosity=0)
+        results = assets.precompress(settings.STATIC_ROOT)
+        original = sum(size for _, size, _, _ in results)
+        gzipped = sum(gz or size for _, size, gz, _ in results)
+        summary = f"Precompressed {len(results)} files: {original / 1024:.0f} KB -> {gzipped / 1024:.0f} KB gzip"
+        if assets.brotli is not None:
+            summary += f", {sum(br or size for _, size, _, br in results) / 1024:.0f} KB brotli"
+        else:
+            summary += " (install brotli for .br copies)"
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from finance import caching
+
+
+class Command(BaseCommand):
+    help = "Show dashboard cache hit/miss counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Zero the counters after printing them.")
+
+    def handle(self, *args, **options):
+        stats = caching.dashboard_stats()
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hit_rate']:.1%}"
+        )
+        if options['reset']:
+            caching.reset_dashboard_stats()
+            self.stdout.write("Counters reset.")
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from finance import forecasting
+
+
+class Command(BaseCommand):
+    help = "Recompute goal allocation and completion forecasts for every user."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=forecasting.BATCH_SIZE,
+                            help="Users per vectorized pass.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = forecasting.forecast_all(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Forecast {count} goals in {time.perf_counter() - started:.2f}s"
+        ))
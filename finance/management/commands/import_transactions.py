@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import imports
+from finance.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Import a CSV or OFX bank statement into a user's transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--format', dest='file_format', choices=['csv', 'ofx'],
+                            help="Defaults to detection from the file extension.")
+        parser.add_argument('--batch-size', type=int, default=imports.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(username=options['username'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Unknown user: {options['username']}")
+
+        file_format = options['file_format'] or imports.detect_format(options['path'])
+        try:
+            with open(options['path'], 'rb') as statement:
+                report = imports.import_file(user, statement, file_format, batch_size=options['batch_size'])
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        for line, errors in report.rejects:
+            self.stderr.write(f"row {line}: {'; '.join(errors)}")
+        if report.rejected > len(report.rejects):
+            self.stderr.write(f"... and {report.rejected - len(report.rejects)} more rejected rows")
+        self.stdout.write(self.style.SUCCESS(report.summary()))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from finance import purge
+
+
+class Command(BaseCommand):
+    help = "Delete user accounts and all their data in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('users', nargs='+', type=int, metavar='USER_ID')
+        parser.add_argument('--batch-size', type=int, default=purge.BATCH_SIZE,
+                            help="Rows deleted per statement.")
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help="Seconds to pause between batches, to let other writers in.")
+
+    def handle(self, *args, **options):
+        # An interrupted purge leaves the account deactivated; running the
+        # command again for the same id finishes it.
+        for user_id in options['users']:
+            report = purge.purge_user(
+                user_id, batch_size=options['batch_size'], sleep=options['sleep'],
+                progress=lambda name, deleted: self.stdout.write(f"  {name}: {deleted}"),
+            )
+            self.stdout.write(self.style.SUCCESS(report.summary()))
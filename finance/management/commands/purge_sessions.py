@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Delete expired sessions from the database in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help="Seconds to pause between batches, to let other writers in.")
+
+    def handle(self, *args, **options):
+        if settings.FINTRACK_SESSION_BACKEND == 'signed_cookies':
+            self.stdout.write("Sessions are stored in signed cookies; there is nothing to purge.")
+            return
+
+        # Unlike clearsessions, which deletes every expired row in one
+        # statement, each batch holds the write lock only briefly.
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+        deleted = 0
+        while True:
+            keys = list(expired.values_list('pk', flat=True)[:options['batch_size']])
+            if not keys:
+                break
+            deleted += Session.objects.filter(pk__in=keys).delete()[0]
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired session(s)."))
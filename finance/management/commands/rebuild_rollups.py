@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import rollups
+from finance.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or with --verify, check) the per-user monthly rollup table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', dest='usernames', action='append', default=[],
+                            help="Limit to this username (repeatable).")
+        parser.add_argument('--verify', action='store_true',
+                            help="Only report buckets that disagree with the transactions; exit non-zero on drift.")
+
+    def handle(self, *args, **options):
+        users = CustomUser.objects.order_by('pk')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+            missing = set(options['usernames']) - set(users.values_list('username', flat=True))
+            if missing:
+                raise CommandError(f"Unknown user(s): {', '.join(sorted(missing))}")
+
+        drifted = 0
+        for user in users.iterator():
+            if options['verify']:
+                mismatches = rollups.verify_user(user.pk)
+                for (_, month, category_id, transaction_type), stored, expected in mismatches:
+                    self.stdout.write(
+                        f"{user.username} {month:%Y-%m} category={category_id} {transaction_type}: "
+                        f"stored={stored} expected={expected}"
+                    )
+                drifted += bool(mismatches)
+            else:
+                rollups.rebuild_user(user.pk)
+                self.stdout.write(f"Rebuilt rollups for {user.username}")
+
+        if options['verify']:
+            if drifted:
+                raise CommandError(f"{drifted} user(s) have rollup drift; run rebuild_rollups to repair.")
+            self.stdout.write(self.style.SUCCESS("Rollups match transactions."))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import ledger
+from finance.models import CustomUser
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Compare every user's ledger balance with their transactions and repair any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', dest='usernames', action='append', default=[],
+                            help="Limit to this username (repeatable).")
+        parser.add_argument('--check', action='store_true',
+                            help="Only report drift, without repairing it; exit non-zero if any is found.")
+
+    def handle(self, *args, **options):
+        users = CustomUser.objects.order_by('pk')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+            missing = set(options['usernames']) - set(users.values_list('username', flat=True))
+            if missing:
+                raise CommandError(f"Unknown user(s): {', '.join(sorted(missing))}")
+
+        user_ids = list(users.values_list('pk', flat=True))
+        drifted = []
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            mismatches = ledger.verify(user_ids[start:start + BATCH_SIZE])
+            for user_id, stored, expected in mismatches:
+                self.stdout.write(f"user={user_id}: stored={stored} expected={expected}")
+            drifted += [user_id for user_id, _, _ in mismatches]
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(f"Balances of {len(user_ids)} user(s) match their transactions."))
+        elif options['check']:
+            raise CommandError(f"{len(drifted)} user(s) have balance drift; run reconcile_balances to repair.")
+        else:
+            ledger.rebuild(drifted)
+            self.stdout.write(self.style.SUCCESS(f"Repaired the balances of {len(drifted)} user(s)."))
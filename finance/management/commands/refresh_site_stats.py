@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from finance.models import SiteStats
+
+
+class Command(BaseCommand):
+    help = "Recompute the site-wide statistics snapshot shown on the admin dashboard."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0,
+                            help="Keep running and refresh every INTERVAL seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            stats = SiteStats.refresh()
+            self.stdout.write(
+                f"{stats} refreshed in {time.perf_counter() - started:.2f}s: "
+                f"{stats.total_users} users, {stats.total_transactions} transactions, {stats.total_goals} goals"
+            )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,32 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import jobs
+
+
+class Command(BaseCommand):
+    help = "Run background report jobs in a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Worker processes to run (default: the number of CPUs).")
+        parser.add_argument('--drain', action='store_true',
+                            help="Exit once no queued job can be claimed instead of waiting for more.")
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help="Seconds an idle worker waits before checking the queue again.")
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError("--workers must be at least 1.")
+
+        requeued = jobs.requeue_stale()
+        if requeued:
+            self.stdout.write(f"Returned {requeued} stale job(s) to the queue.")
+        self.stdout.write(f"Starting {options['workers']} worker(s).")
+        started = time.perf_counter()
+        per_worker = jobs.run_pool(options['workers'], drain=options['drain'], poll_interval=options['poll_interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Ran {sum(per_worker)} job(s) in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import benchmarking
+from finance.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate synthetic users, transactions and goals for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--transactions', type=int, default=100_000,
+                            help="Total transactions, split evenly across the users.")
+        parser.add_argument('--years', type=int, default=10, help="Spread transaction dates over this many years.")
+        parser.add_argument('--goals-per-user', type=int, default=3)
+        parser.add_argument('--categories', type=int, default=12,
+                            help=f"Expense categories per user (max {len(benchmarking.CATEGORY_NAMES)}).")
+        parser.add_argument('--income-share', type=float, default=0.3,
+                            help="Fraction of transactions that are income.")
+        parser.add_argument('--prefix', default=benchmarking.DEFAULT_PREFIX, help="Username prefix.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed; equal seeds give equal data.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if CustomUser.objects.filter(username__startswith=options['prefix']).exists():
+            raise CommandError(f"Users starting with {options['prefix']!r} already exist; choose another --prefix.")
+        if not 1 <= options['categories'] <= len(benchmarking.CATEGORY_NAMES):
+            raise CommandError(f"--categories must be between 1 and {len(benchmarking.CATEGORY_NAMES)}.")
+
+        def progress(done, report):
+            self.stdout.write(f"{done}/{options['users']} users, {report.transactions} transactions")
+
+        report = benchmarking.seed(
+            users=options['users'],
+            transactions=options['transactions'],
+            years=options['years'],
+            goals_per_user=options['goals_per_user'],
+            categories=options['categories'],
+            income_share=options['income_share'],
+            prefix=options['prefix'],
+            random_seed=options['seed'],
+            batch_size=options['batch_size'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Seeded {report.summary()}"))
+        self.stdout.write(f"Log in as {options['prefix']}00000 (staff) with password {benchmarking.BENCHMARK_PASSWORD!r}.")
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0003_transaction_user_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='import_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Content hash of the imported statement row, used to skip re-uploads', max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(fields=('user', 'import_hash'), name='finance_txn_unique_import_hash'),
+        ),
+    ]
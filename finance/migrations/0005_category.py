@@ -0,0 +1,41 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0004_transaction_import_hash'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='monthlyrollup',
+            name='finance_rollup_unique_bucket',
+        ),
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('key', models.CharField(editable=False, help_text='Normalized name; unique per user', max_length=255)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='categories', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'categories',
+                'ordering': ['name'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'key'), name='finance_category_unique_key')],
+            },
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='category_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='+', to='finance.category'),
+        ),
+        migrations.AddField(
+            model_name='monthlyrollup',
+            name='category_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='finance.category'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+"""Convert free-text transaction categories into per-user Category rows.
+
+Transactions are walked in primary-key batches so memory stays bounded on
+large tables; the rollups are then recomputed against the new keys.
+"""
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+BATCH_SIZE = 5000
+
+
+def clean_name(name):
+    return ' '.join(name.split())
+
+
+def normalize(name):
+    return clean_name(name).casefold()
+
+
+def populate_categories(apps, schema_editor):
+    Category = apps.get_model('finance', 'Category')
+    Transaction = apps.get_model('finance', 'Transaction')
+    MonthlyRollup = apps.get_model('finance', 'MonthlyRollup')
+
+    category_ids = {}  # (user_id, key) -> Category.id
+    last_pk = 0
+    while True:
+        batch = list(
+            Transaction.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'user_id', 'category')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1][0]
+
+        new_categories = {}
+        for _, user_id, name in batch:
+            key = (user_id, normalize(name))
+            if key not in category_ids and key not in new_categories:
+                new_categories[key] = Category(user_id=user_id, key=key[1], name=clean_name(name))
+        Category.objects.bulk_create(new_categories.values())
+        category_ids.update((key, category.pk) for key, category in new_categories.items())
+
+        pks_by_category = defaultdict(list)
+        for pk, user_id, name in batch:
+            pks_by_category[category_ids[(user_id, normalize(name))]].append(pk)
+        for category_id, pks in pks_by_category.items():
+            Transaction.objects.filter(pk__in=pks).update(category_ref_id=category_id)
+
+    MonthlyRollup.objects.all().delete()
+    rows = (
+        Transaction.objects.order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('user_id', 'month', 'category_ref_id', 'transaction_type')
+        .annotate(total=Sum('amount'), count=Count('id'))
+    )
+    MonthlyRollup.objects.bulk_create(
+        (MonthlyRollup(category='', **row) for row in rows.iterator()), batch_size=1000,
+    )
+
+
+def restore_category_names(apps, schema_editor):
+    Transaction = apps.get_model('finance', 'Transaction')
+    MonthlyRollup = apps.get_model('finance', 'MonthlyRollup')
+    for transaction in Transaction.objects.select_related('category_ref').iterator(chunk_size=BATCH_SIZE):
+        transaction.category = transaction.category_ref.name
+        transaction.save(update_fields=['category'])
+    for rollup in MonthlyRollup.objects.select_related('category_ref').iterator(chunk_size=BATCH_SIZE):
+        rollup.category = rollup.category_ref.name
+        rollup.save(update_fields=['category'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0005_category'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_categories, restore_category_names),
+    ]
@@ -0,0 +1,55 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0006_populate_categories'),
+    ]
+
+    operations = [
+        # A default lets the text columns be re-added if this migration is reversed.
+        migrations.AlterField(
+            model_name='transaction',
+            name='category',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='monthlyrollup',
+            name='category',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.RemoveField(
+            model_name='transaction',
+            name='category',
+        ),
+        migrations.RemoveField(
+            model_name='monthlyrollup',
+            name='category',
+        ),
+        migrations.RenameField(
+            model_name='transaction',
+            old_name='category_ref',
+            new_name='category',
+        ),
+        migrations.RenameField(
+            model_name='monthlyrollup',
+            old_name='category_ref',
+            new_name='category',
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='transactions', to='finance.category'),
+        ),
+        migrations.AlterField(
+            model_name='monthlyrollup',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='finance.category'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'month', 'category', 'transaction_type'), name='finance_rollup_unique_bucket'),
+        ),
+    ]
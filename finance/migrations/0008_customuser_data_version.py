@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0007_category_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='data_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False, help_text="Bumped on every change to the user's financial data"),
+        ),
+    ]
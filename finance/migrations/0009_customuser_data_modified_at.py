@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0008_customuser_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='data_modified_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text="When the user's transactions, goals or categories last changed", null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0009_customuser_data_modified_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_users', models.PositiveIntegerField(default=0)),
+                ('active_users', models.PositiveIntegerField(default=0)),
+                ('total_transactions', models.PositiveBigIntegerField(default=0)),
+                ('total_goals', models.PositiveBigIntegerField(default=0)),
+                ('users_with_transactions', models.PositiveIntegerField(default=0)),
+                ('users_with_goals', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'site stats',
+            },
+        ),
+    ]
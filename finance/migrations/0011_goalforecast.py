@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0010_sitestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalForecast',
+            fields=[
+                ('goal', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='forecast', serialize=False, to='finance.goal')),
+                ('allocated', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('progress', models.FloatField(default=0)),
+                ('projected_completion', models.DateField(blank=True, help_text='Empty when savings are not growing', null=True)),
+                ('on_track', models.BooleanField(default=False)),
+                ('data_version', models.PositiveBigIntegerField(default=0, help_text='User data version the forecast was computed from')),
+                ('as_of', models.DateField(help_text='Day the projection starts from')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
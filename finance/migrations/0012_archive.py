@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0011_goalforecast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='archived_until',
+            field=models.DateField(blank=True, editable=False, help_text='Transactions dated before this day may be in the archive', null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedTransaction',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('user_id', models.BigIntegerField()),
+                ('title', models.CharField(max_length=100)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('transaction_type', models.CharField(choices=[('income', 'Income'), ('expense', 'Expense')], max_length=10)),
+                ('date', models.DateField()),
+                ('category_id', models.BigIntegerField()),
+                ('category_name', models.CharField(max_length=255)),
+                ('import_hash', models.CharField(blank=True, max_length=64, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_id', '-date', '-id'], name='finance_archive_user_date_id')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchiveSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('transaction_type', models.CharField(choices=[('income', 'Income'), ('expense', 'Expense')], max_length=10)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='+', to='finance.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archive_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'year', 'category', 'transaction_type'), name='finance_archive_snapshot_unique_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_balances(apps, schema_editor):
+    Transaction = apps.get_model('finance', 'Transaction')
+    ArchiveSnapshot = apps.get_model('finance', 'ArchiveSnapshot')
+    UserBalance = apps.get_model('finance', 'UserBalance')
+    totals = {}
+    live = (
+        Transaction.objects.order_by()
+        .values_list('user_id', 'transaction_type')
+        .annotate(total=Sum('amount'), count=Count('id'))
+    )
+    archived = (
+        ArchiveSnapshot.objects.order_by()
+        .values_list('user_id', 'transaction_type')
+        .annotate(total=Sum('total'), count=Sum('count'))
+    )
+    for rows in (live, archived):
+        for user_id, transaction_type, total, count in rows:
+            balance = totals.setdefault(user_id, UserBalance(user_id=user_id))
+            if transaction_type == 'income':
+                balance.total_income += total
+            else:
+                balance.total_expenses += total
+            balance.transaction_count += count
+    UserBalance.objects.bulk_create(totals.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0012_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserBalance',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ledger_balance', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_income', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('total_expenses', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('transaction_count', models.IntegerField(default=0)),
+                ('modified_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(populate_balances, migrations.RunPython.noop),
+    ]
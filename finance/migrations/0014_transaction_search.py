@@ -0,0 +1,97 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:45
+
+import django.db.models.deletion
+import finance.models
+from django.db import migrations, models
+
+# Transactions are indexed with their category name and an owner token
+# ("u<user_id>") so per-user searches stay inside the index.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE finance_transaction_search USING fts5(
+        owner, title, category, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    # Rank title matches above category matches; owner never contributes.
+    "INSERT INTO finance_transaction_search(finance_transaction_search, rank) VALUES ('rank', 'bm25(0.0, 10.0, 4.0)')",
+    """
+    INSERT INTO finance_transaction_search(rowid, owner, title, category)
+    SELECT t.id, 'u' || t.user_id, t.title, c.name
+    FROM finance_transaction t JOIN finance_category c ON c.id = t.category_id
+    """,
+    """
+    CREATE TRIGGER finance_transaction_search_insert AFTER INSERT ON finance_transaction BEGIN
+        INSERT INTO finance_transaction_search(rowid, owner, title, category)
+        SELECT new.id, 'u' || new.user_id, new.title, name FROM finance_category WHERE id = new.category_id;
+    END
+    """,
+    """
+    CREATE TRIGGER finance_transaction_search_delete AFTER DELETE ON finance_transaction BEGIN
+        DELETE FROM finance_transaction_search WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER finance_transaction_search_update
+    AFTER UPDATE OF title, category_id, user_id ON finance_transaction BEGIN
+        DELETE FROM finance_transaction_search WHERE rowid = old.id;
+        INSERT INTO finance_transaction_search(rowid, owner, title, category)
+        SELECT new.id, 'u' || new.user_id, new.title, name FROM finance_category WHERE id = new.category_id;
+    END
+    """,
+    """
+    CREATE TRIGGER finance_category_search_rename
+    AFTER UPDATE OF name ON finance_category WHEN old.name IS NOT new.name BEGIN
+        UPDATE finance_transaction_search SET category = new.name
+        WHERE rowid IN (SELECT id FROM finance_transaction WHERE category_id = new.id);
+    END
+    """,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS finance_category_search_rename',
+    'DROP TRIGGER IF EXISTS finance_transaction_search_update',
+    'DROP TRIGGER IF EXISTS finance_transaction_search_delete',
+    'DROP TRIGGER IF EXISTS finance_transaction_search_insert',
+    'DROP TABLE IF EXISTS finance_transaction_search',
+]
+
+
+def create_search_index(apps, schema_editor):
+    # Other backends use the icontains fallback in finance.search.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0013_userbalance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionSearch',
+            fields=[
+                ('transaction', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='finance.transaction')),
+                ('owner', models.TextField()),
+                ('title', models.TextField()),
+                ('category', models.TextField()),
+                ('document', finance.models.SearchDocumentField(db_column='finance_transaction_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'finance_transaction_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
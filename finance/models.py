@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinLengthValidator
 from django.conf import settings
@@ -19,6 +21,12 @@ class CustomUser(AbstractUser):
     )
 
     email = models.EmailField(unique=True, help_text="Required. Enter a valid email address.")
+    data_version = models.PositiveBigIntegerField(default=0, editable=False,
+                                                  help_text="Bumped on every change to the user's financial data")
+    data_modified_at = models.DateTimeField(blank=True, null=True, editable=False,
+                                            help_text="When the user's transactions, goals or categories last changed")
+    archived_until = models.DateField(blank=True, null=True, editable=False,
+                                      help_text="Transactions dated before this day may be in the archive")
 
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['email']
@@ -29,6 +37,114 @@ class CustomUser(AbstractUser):
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}".strip() or self.username
 
+class CategoryQuerySet(models.QuerySet):
+    def for_name(self, user, name):
+        """Return the user's category matching ``name``, creating it if needed."""
+        category, _ = self.get_or_create(
+            user=user, key=Category.normalize(name), defaults={'name': Category.clean_name(name)},
+        )
+        return category
+
+    def resolve(self, user, names):
+        """Map the normalized key of each name to a category, creating missing ones in bulk."""
+        wanted = {}
+        for name in names:
+            wanted.setdefault(Category.normalize(name), Category.clean_name(name))
+        found = {category.key: category for category in self.filter(user=user, key__in=list(wanted))}
+        missing = [Category(user=user, key=key, name=name) for key, name in wanted.items() if key not in found]
+        if missing:
+            self.bulk_create(missing, ignore_conflicts=True)
+            found.update(
+                (category.key, category)
+                for category in self.filter(user=user, key__in=[category.key for category in missing])
+            )
+        return found
+
+
+class Category(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='categories')
+    name = models.CharField(max_length=255)
+    key = models.CharField(max_length=255, editable=False, help_text="Normalized name; unique per user")
+
+    objects = CategoryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name_plural = 'categories'
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='finance_category_unique_key'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def clean_name(name):
+        return ' '.join(name.split())
+
+    @staticmethod
+    def normalize(name):
+        """"Food", "food " and "FOOD" all normalize to "food"."""
+        return Category.clean_name(name).casefold()
+
+    def save(self, *args, **kwargs):
+        self.name = self.clean_name(self.name)
+        self.key = self.normalize(self.name)
+        super().save(*args, **kwargs)
+
+
+class TransactionQuerySet(models.QuerySet):
+    """Keeps ``MonthlyRollup`` in sync for writes that bypass ``save()``/``delete()``."""
+
+    ROLLUP_FIELDS = {'user', 'user_id', 'amount', 'transaction_type', 'date', 'category', 'category_id'}
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from finance import rollups
+        from finance.caching import bump_data_version
+
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+            # Which rows actually landed is unknown, so recount the touched months.
+            rollups.rebuild_months({(obj.user_id, rollups.month_of(obj.date)) for obj in objs})
+        else:
+            rollups.add_transactions(objs)
+        bump_data_version({obj.user_id for obj in objs})
+        return objs
+
+    def update(self, **kwargs):
+        from finance import rollups
+        from finance.caching import bump_data_version
+
+        with transaction.atomic(using=self.db):
+            if not self.ROLLUP_FIELDS.intersection(kwargs):
+                bump_data_version(set(self.values_list('user_id', flat=True).distinct()))
+                return super().update(**kwargs)
+            pks = list(self.values_list('pk', flat=True))
+            affected = rollups.months_for(Transaction.objects.filter(pk__in=pks))
+            rows = super().update(**kwargs)
+            affected |= rollups.months_for(Transaction.objects.filter(pk__in=pks))
+            rollups.rebuild_months(affected)
+            bump_data_version({user_id for user_id, _ in affected})
+        return rows
+
+    update.alters_data = True
+
+    def delete(self):
+        from finance import rollups
+        from finance.caching import bump_data_version
+
+        with transaction.atomic(using=self.db):
+            affected = rollups.months_for(self)
+            with rollups.suspended():
+                result = super().delete()
+            rollups.rebuild_months(affected)
+            bump_data_version({user_id for user_id, _ in affected})
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Transaction(models.Model):
     TRANSACTION_TYPES = [
         ('income', 'Income'),
@@ -39,11 +155,76 @@ class Transaction(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     transaction_type = models.CharField(max_length=10, choices=TRANSACTION_TYPES)
     date = models.DateField()
-    category = models.CharField(max_length=255)
-    
+    category = models.ForeignKey(Category, on_delete=models.RESTRICT, related_name='transactions')
+    import_hash = models.CharField(max_length=64, blank=True, null=True, editable=False,
+                                   help_text="Content hash of the imported statement row, used to skip re-uploads")
+
+    objects = TransactionQuerySet.as_manager()
+
+    is_archived = False
+
+    class Meta:
+        indexes = [
+            # Serves the per-user, newest-first keyset pagination in TransactionListView.
+            models.Index(fields=['user', '-date', '-id'], name='finance_txn_user_date_id'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'import_hash'], name='finance_txn_unique_import_hash'),
+        ]
+
     def __str__(self):
         return self.title
-    
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._rollup_state = instance.rollup_key()
+        return instance
+
+    def rollup_key(self):
+        """The (user, month, category, type) bucket and amount this row counts towards."""
+        if self.date is None or self.amount is None:
+            return None
+        # Values may still be raw input (e.g. strings) when the row was built by hand.
+        day = self._meta.get_field('date').to_python(self.date)
+        amount = self._meta.get_field('amount').to_python(self.amount)
+        return (self.user_id, day.replace(day=1), self.category_id, self.transaction_type), amount
+
+
+class SearchDocumentField(models.TextField):
+    """The hidden column of an FTS5 table that is named after the table itself."""
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class TransactionSearch(models.Model):
+    """Read-only view of the SQLite FTS5 index over transaction titles and categories.
+
+    The table and the triggers that keep it in sync with ``Transaction`` and
+    ``Category`` are created by migration 0014 on SQLite only; see
+    ``finance.search``.
+    """
+    transaction = models.OneToOneField(Transaction, on_delete=models.DO_NOTHING, primary_key=True,
+                                       db_column='rowid', related_name='search')
+    owner = models.TextField()
+    title = models.TextField()
+    category = models.TextField()
+    document = SearchDocumentField(db_column='finance_transaction_search')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'finance_transaction_search'
+
+
 class Goal(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
@@ -51,4 +232,204 @@ class Goal(models.Model):
     deadline = models.DateField()
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+class GoalForecast(models.Model):
+    """Precomputed progress and completion forecast for one goal (see ``finance.forecasting``)."""
+    goal = models.OneToOneField(Goal, on_delete=models.CASCADE, primary_key=True, related_name='forecast')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    allocated = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    progress = models.FloatField(default=0)
+    projected_completion = models.DateField(null=True, blank=True, help_text="Empty when savings are not growing")
+    on_track = models.BooleanField(default=False)
+    data_version = models.PositiveBigIntegerField(default=0, help_text="User data version the forecast was computed from")
+    as_of = models.DateField(help_text="Day the projection starts from")
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Forecast for {self.goal}"
+
+    def is_current(self, user, today):
+        return self.data_version == user.data_version and self.as_of == today
+
+
+class MonthlyRollup(models.Model):
+    """Per-user monthly totals, maintained incrementally from ``Transaction`` writes."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='monthly_rollups')
+    month = models.DateField(help_text="First day of the month")
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    transaction_type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'month', 'category', 'transaction_type'],
+                name='finance_rollup_unique_bucket',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.month:%Y-%m} {self.category_id} {self.transaction_type}"
+
+
+class UserBalance(models.Model):
+    """Running totals of all of a user's transactions, live and archived (see ``finance.ledger``)."""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+                                related_name='ledger_balance')
+    total_income = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    total_expenses = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    transaction_count = models.IntegerField(default=0)
+    modified_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Balance of {self.user_id}"
+
+    @property
+    def balance(self):
+        return self.total_income - self.total_expenses
+
+
+class ArchivedTransaction(models.Model):
+    """A transaction moved out of ``Transaction`` by ``finance.archive``.
+
+    It keeps its original id. The user and category are stored as plain ids
+    (plus the category name) so the table can live in a separate database;
+    see ``finance.routers.ArchiveRouter``.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user_id = models.BigIntegerField()
+    title = models.CharField(max_length=100)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    transaction_type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    date = models.DateField()
+    category_id = models.BigIntegerField()
+    category_name = models.CharField(max_length=255)
+    import_hash = models.CharField(max_length=64, blank=True, null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    is_archived = True
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_id', '-date', '-id'], name='finance_archive_user_date_id'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    @property
+    def category(self):
+        return self.category_name
+
+
+class ArchiveSnapshot(models.Model):
+    """Yearly totals of a user's archived transactions, per category and type.
+
+    Dashboard totals add these to ``MonthlyRollup``, which only covers live rows.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archive_snapshots')
+    year = models.PositiveSmallIntegerField()
+    category = models.ForeignKey(Category, on_delete=models.RESTRICT, related_name='+')
+    transaction_type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'year', 'category', 'transaction_type'],
+                name='finance_archive_snapshot_unique_bucket',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.year} {self.category_id} {self.transaction_type}"
+
+
+def report_upload_to(job, filename):
+    return f'reports/{job.user_id}/{filename}'
+
+
+class ReportJob(models.Model):
+    """A transaction export generated in the background by ``run_workers`` (see ``finance.jobs``)."""
+    QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+    STATUSES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+    FORMATS = [('xlsx', 'Excel'), ('csv', 'CSV')]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='report_jobs')
+    format = models.CharField(max_length=4, choices=FORMATS, default='xlsx')
+    params = models.JSONField(default=dict, blank=True, help_text="Transaction list filters the export applies")
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    output = models.FileField(upload_to=report_upload_to, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=64, blank=True, help_text="Worker that claimed the job")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Workers claim the oldest queued job; users list their own.
+            models.Index(fields=['status', 'created_at'], name='finance_reportjob_queue_idx'),
+            models.Index(fields=['user', '-created_at'], name='finance_reportjob_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"Report {self.pk} ({self.status})"
+
+    @property
+    def is_pending(self):
+        return self.status in (self.QUEUED, self.RUNNING)
+
+    @property
+    def filename(self):
+        return f'transactions.{self.format}'
+
+
+class SiteStats(models.Model):
+    """Site-wide counters for the admin dashboard, refreshed by ``refresh_site_stats``.
+
+    There is a single row (pk=1); reading it replaces eight full-table queries.
+    """
+    total_users = models.PositiveIntegerField(default=0)
+    active_users = models.PositiveIntegerField(default=0)
+    total_transactions = models.PositiveBigIntegerField(default=0)
+    total_goals = models.PositiveBigIntegerField(default=0)
+    users_with_transactions = models.PositiveIntegerField(default=0)
+    users_with_goals = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = 'site stats'
+
+    def __str__(self):
+        return f"Site stats as of {self.refreshed_at:%Y-%m-%d %H:%M}"
+
+    @classmethod
+    def current(cls):
+        """Return the snapshot, computing it once if it has never been refreshed."""
+        return cls.objects.filter(pk=1).first() or cls.refresh()
+
+    @classmethod
+    def refresh(cls):
+        # EXISTS stops at the first matching row per user instead of joining
+        # and de-duplicating the whole Transaction/Goal tables.
+        has_transactions = Exists(Transaction.objects.filter(user=OuterRef('pk')))
+        has_goals = Exists(Goal.objects.filter(user=OuterRef('pk')))
+        users = CustomUser.objects.aggregate(
+            total_users=Count('pk'),
+            active_users=Count('pk', filter=Q(is_active=True)),
+            users_with_transactions=Count('pk', filter=Q(has_transactions)),
+            users_with_goals=Count('pk', filter=Q(has_goals)),
+        )
+        stats, _ = cls.objects.update_or_create(pk=1, defaults={
+            **users,
+            'total_transactions': Transaction.objects.count(),
+            'total_goals': Goal.objects.count(),
+            'refreshed_at': timezone.now(),
+        })
+        return stats
@@ -0,0 +1,164 @@
+"""Keyset (cursor) pagination over ``(date, id)`` for transaction listings.
+
+Each page is a single indexed range scan, so page N costs the same as page 1
+no matter how deep the user has paged. Search results, which are ordered by
+relevance rather than date, are paged by number with ``paginate_ranked``.
+"""
+from datetime import date
+
+from django.db.models import Q
+
+
+def encode_cursor(obj):
+    return f"{obj.date.isoformat()}_{obj.pk}"
+
+
+def decode_cursor(value):
+    """Parse a cursor produced by ``encode_cursor``; returns ``None`` if malformed."""
+    if not value:
+        return None
+    try:
+        day, pk = value.split('_', 1)
+        return date.fromisoformat(day), int(pk)
+    except ValueError:
+        return None
+
+
+class KeysetPage:
+    # Query parameters that carry ``next_cursor`` and ``previous_cursor``.
+    next_param = 'after'
+    previous_param = 'before'
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class NumberedPage(KeysetPage):
+    """A page of ``paginate_ranked``; its cursors are page numbers."""
+    next_param = previous_param = 'page'
+
+
+def _keyset_query(queryset, after, before, per_page):
+    """Return the sliced queryset for one page and a function that turns its rows into a ``KeysetPage``."""
+    after, before = decode_cursor(after), decode_cursor(before)
+
+    if before is not None:
+        day, pk = before
+
+        def newer_page(rows):
+            more_newer = len(rows) > per_page
+            rows = rows[:per_page][::-1]
+            return KeysetPage(
+                rows,
+                next_cursor=encode_cursor(rows[-1]) if rows else None,
+                previous_cursor=encode_cursor(rows[0]) if rows and more_newer else None,
+            )
+
+        query = queryset.filter(Q(date__gt=day) | Q(date=day, pk__gt=pk)).order_by('date', 'pk')
+        return query[:per_page + 1], newer_page
+
+    def older_page(rows):
+        more_older = len(rows) > per_page
+        rows = rows[:per_page]
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(rows[-1]) if more_older else None,
+            previous_cursor=encode_cursor(rows[0]) if rows and after is not None else None,
+        )
+
+    if after is not None:
+        day, pk = after
+        queryset = queryset.filter(Q(date__lt=day) | Q(date=day, pk__lt=pk))
+    return queryset.order_by('-date', '-pk')[:per_page + 1], older_page
+
+
+def _archive_needed(rows, before, per_page, archive_until):
+    """Whether archived rows (all dated before ``archive_until``) can fall on this page."""
+    before = decode_cursor(before)
+    if before is not None:
+        return before[0] < archive_until
+    return len(rows) <= per_page or rows[-1].date < archive_until
+
+
+def _merge(rows, archived_rows, before, per_page):
+    newest_first = decode_cursor(before) is None
+    return sorted(rows + archived_rows, key=lambda row: (row.date, row.pk), reverse=newest_first)[:per_page + 1]
+
+
+def paginate_keyset(queryset, after=None, before=None, per_page=50, archive=None, archive_until=None):
+    """Return one newest-first page of ``queryset``.
+
+    ``after`` continues past an older boundary row (the "next" link) and
+    ``before`` walks back towards newer rows (the "previous" link). Rows of
+    the ``archive`` queryset (all dated before ``archive_until``) are merged
+    in by ``(date, id)``; it is only queried when the page reaches that far back.
+    """
+    query, page = _keyset_query(queryset, after, before, per_page)
+    rows = list(query)
+    if archive is not None and _archive_needed(rows, before, per_page, archive_until):
+        archive_query, _ = _keyset_query(archive, after, before, per_page)
+        rows = _merge(rows, list(archive_query), before, per_page)
+    return page(rows)
+
+
+async def apaginate_keyset(queryset, after=None, before=None, per_page=50, archive=None, archive_until=None):
+    """Async version of ``paginate_keyset``."""
+    query, page = _keyset_query(queryset, after, before, per_page)
+    rows = [row async for row in query]
+    if archive is not None and _archive_needed(rows, before, per_page, archive_until):
+        archive_query, _ = _keyset_query(archive, after, before, per_page)
+        rows = _merge(rows, [row async for row in archive_query], before, per_page)
+    return page(rows)
+
+
+def _page_number(value):
+    try:
+        return max(int(value), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def _ranked_query(queryset, page, per_page):
+    number = _page_number(page)
+    start = (number - 1) * per_page
+
+    def numbered_page(rows):
+        return NumberedPage(
+            rows[:per_page],
+            next_cursor=number + 1 if len(rows) > per_page else None,
+            previous_cursor=number - 1 if number > 1 else None,
+        )
+
+    return queryset[start:start + per_page + 1], numbered_page
+
+
+def paginate_ranked(queryset, page=None, per_page=50):
+    """Return page ``page`` (1-based) of a queryset in its own order, such as search results by relevance.
+
+    Relevance has no stable cursor, so this uses ``OFFSET``; it suits result
+    lists people skim a few pages of, not browsing the full history.
+    """
+    query, numbered_page = _ranked_query(queryset, page, per_page)
+    return numbered_page(list(query))
+
+
+async def apaginate_ranked(queryset, page=None, per_page=50):
+    """Async version of ``paginate_ranked``."""
+    query, numbered_page = _ranked_query(queryset, page, per_page)
+    return numbered_page([row async for row in query])
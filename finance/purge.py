@@ -0,0 +1,98 @@
+"""Deleting accounts without loading their data.
+
+``CustomUser.delete()`` lets Django's collector fetch every related
+transaction, goal and rollup into memory before deleting them, inside one
+write transaction that blocks every other writer until it finishes.
+``purge_user`` instead deactivates the account (which signs it out) and then
+deletes its rows table by table in batches of ``BATCH_SIZE`` primary keys,
+each batch a single ``DELETE`` committed on its own. Signals are skipped, so
+the rollups and ledger are not maintained row by row; their rows are
+deleted afterwards like the rest. The search index triggers still run in
+the database. The user row goes last, once nothing is left to collect.
+
+Every step only deletes what is still there, so an interrupted purge is
+finished by running it again.
+"""
+import time
+
+from django.db import router
+
+from .caching import forget_users
+from .models import (
+    ArchivedTransaction, ArchiveSnapshot, Category, CustomUser, Goal, GoalForecast, MonthlyRollup, ReportJob,
+    Transaction, UserBalance,
+)
+
+BATCH_SIZE = 1000
+# Children before the rows they reference (transactions and snapshots restrict
+# category deletes); the model's user column is ``user_id`` throughout.
+MODELS = [
+    ReportJob, GoalForecast, Goal, Transaction, ArchivedTransaction, MonthlyRollup, ArchiveSnapshot,
+    Category, UserBalance,
+]
+
+
+class PurgeReport:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.deleted = {model._meta.verbose_name_plural: 0 for model in MODELS}
+        self.user_deleted = False
+        self.elapsed = 0.0
+
+    def summary(self):
+        rows = ', '.join(f"{count} {name}" for name, count in self.deleted.items() if count)
+        outcome = "deleted" if self.user_deleted else "had no account row left"
+        return f"User {self.user_id} {outcome}; removed {rows or 'no related rows'} in {self.elapsed:.2f}s"
+
+
+def related_counts(user_ids):
+    """``{verbose name plural: rows}`` that purging ``user_ids`` would delete."""
+    counts = {CustomUser._meta.verbose_name_plural: CustomUser.objects.filter(pk__in=user_ids).count()}
+    for model in MODELS:
+        count = model.objects.filter(user_id__in=user_ids).count()
+        if count:
+            counts[model._meta.verbose_name_plural] = count
+    return counts
+
+
+def _delete_files(jobs):
+    for job in jobs.exclude(output='').only('output'):
+        job.output.delete(save=False)
+
+
+def purge_user(user_id, batch_size=BATCH_SIZE, sleep=0.0, progress=None):
+    """Delete the user ``user_id`` and everything they own.
+
+    ``progress(name, deleted)`` is called after each batch with the model's
+    plural name and its running total. ``sleep`` pauses between batches so
+    other writers get the database lock.
+    """
+    report = PurgeReport(user_id)
+    started = time.perf_counter()
+    CustomUser.objects.filter(pk=user_id, is_active=True).update(is_active=False)
+    forget_users([user_id])
+
+    for model in MODELS:
+        name = model._meta.verbose_name_plural
+        db = router.db_for_write(model)
+        rows = model.objects.using(db).filter(user_id=user_id)
+        if model is ReportJob:
+            _delete_files(rows)
+        while True:
+            pks = list(rows.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            # _raw_delete issues the DELETE without collecting related rows or
+            # sending signals; TransactionQuerySet.delete would recount rollups.
+            report.deleted[name] += model.objects.using(db).filter(pk__in=pks)._raw_delete(db)
+            if progress:
+                progress(name, report.deleted[name])
+            if sleep:
+                time.sleep(sleep)
+
+    user = CustomUser.objects.filter(pk=user_id).first()
+    if user is not None:
+        user.delete()
+        report.user_deleted = True
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -0,0 +1,15 @@
+"""django-import-export resources.
+
+Importing ``import_export`` also loads tablib and openpyxl, so this module is
+only imported where an export actually runs (the transaction admin's export
+actions), never at startup.
+"""
+from import_export import resources
+
+from .models import Transaction
+
+
+class TransactionResource(resources.ModelResource):
+    class Meta:
+        model = Transaction
+        fields = ('date', 'title', 'amount', 'transaction_type')
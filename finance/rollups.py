@@ -0,0 +1,179 @@
+"""Maintenance of the ``MonthlyRollup`` table.
+
+Single-row writes apply signed deltas with ``F()`` expressions; bulk writes
+recount the (user, month) buckets they touched straight from ``Transaction``.
+Either way the net change is passed on to the ``UserBalance`` ledger.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from . import ledger
+from .models import MonthlyRollup, Transaction
+
+_suspended = ContextVar('finance_rollups_suspended', default=False)
+
+
+@contextmanager
+def suspended():
+    """Skip per-instance signal maintenance; the caller recounts afterwards."""
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def is_suspended():
+    return _suspended.get()
+
+
+def month_of(value):
+    return value.replace(day=1)
+
+
+def next_month(value):
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def apply_delta(key, amount, count):
+    """Add ``amount``/``count`` to one bucket and to the user's ledger row."""
+    _apply_bucket(key, amount, count)
+    ledger.adjust({key[0]: ledger.delta(key[3], amount, count)})
+
+
+def _apply_bucket(key, amount, count):
+    """Add ``amount``/``count`` to one bucket, creating or dropping the row as needed."""
+    user_id, month, category_id, transaction_type = key
+    bucket = MonthlyRollup.objects.filter(
+        user_id=user_id, month=month, category_id=category_id, transaction_type=transaction_type,
+    )
+    if not bucket.update(total=F('total') + amount, count=F('count') + count):
+        try:
+            with transaction.atomic():
+                MonthlyRollup.objects.create(
+                    user_id=user_id, month=month, category_id=category_id,
+                    transaction_type=transaction_type, total=amount, count=count,
+                )
+        except IntegrityError:
+            # A concurrent writer created the bucket first.
+            bucket.update(total=F('total') + amount, count=F('count') + count)
+    if count < 0:
+        bucket.filter(count__lte=0).delete()
+
+
+def add_transactions(transactions, sign=1):
+    """Fold a batch of in-memory transactions into the rollups, one write per bucket."""
+    deltas = defaultdict(lambda: [0, 0])
+    for obj in transactions:
+        state = obj.rollup_key()
+        if state is None:
+            continue
+        key, amount = state
+        deltas[key][0] += amount
+        deltas[key][1] += 1
+        obj._rollup_state = state
+    balances = ledger.new_deltas()
+    with transaction.atomic():
+        for key, (amount, count) in deltas.items():
+            _apply_bucket(key, sign * amount, sign * count)
+            ledger.add(balances, key[0], key[3], sign * amount, sign * count)
+        ledger.adjust(balances)
+
+
+def months_for(queryset):
+    """Distinct (user_id, month) pairs covered by a ``Transaction`` queryset."""
+    rows = (
+        queryset.order_by()
+        .annotate(month=TruncMonth('date'))
+        .values_list('user_id', 'month')
+        .distinct()
+    )
+    return set(rows)
+
+
+def aggregate_transactions(queryset):
+    """Group ``queryset`` into rollup buckets: {(user, month, category, type): (total, count)}."""
+    rows = (
+        queryset.order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('user_id', 'month', 'category_id', 'transaction_type')
+        .annotate(total=Sum('amount'), count=Count('id'))
+    )
+    return {
+        (row['user_id'], row['month'], row['category_id'], row['transaction_type']): (row['total'], row['count'])
+        for row in rows
+    }
+
+
+def rebuild_months(user_months):
+    """Recount the given (user_id, month) buckets from the ``Transaction`` table."""
+    by_user = defaultdict(set)
+    for user_id, month in user_months:
+        by_user[user_id].add(month)
+
+    balances = ledger.new_deltas()
+    with transaction.atomic():
+        for user_id, months in by_user.items():
+            stale = MonthlyRollup.objects.filter(user_id=user_id, month__in=months)
+            for transaction_type, total, count in (
+                stale.order_by().values_list('transaction_type').annotate(Sum('total'), Sum('count'))
+            ):
+                ledger.add(balances, user_id, transaction_type, -total, -count)
+            stale.delete()
+            source = Transaction.objects.filter(
+                user_id=user_id, date__gte=min(months), date__lt=next_month(max(months)),
+            )
+            rows = [
+                MonthlyRollup(
+                    user_id=user_id, month=month, category_id=category_id,
+                    transaction_type=transaction_type, total=total, count=count,
+                )
+                for (_, month, category_id, transaction_type), (total, count)
+                in aggregate_transactions(source).items()
+                if month in months
+            ]
+            for row in rows:
+                ledger.add(balances, user_id, row.transaction_type, row.total, row.count)
+            MonthlyRollup.objects.bulk_create(rows)
+        ledger.adjust(balances)
+
+
+def rebuild_user(user_id):
+    """Drop and recompute every rollup row, and the ledger row, belonging to one user."""
+    with transaction.atomic():
+        MonthlyRollup.objects.filter(user_id=user_id).delete()
+        MonthlyRollup.objects.bulk_create([
+            MonthlyRollup(
+                user_id=user_id, month=month, category_id=category_id,
+                transaction_type=transaction_type, total=total, count=count,
+            )
+            for (_, month, category_id, transaction_type), (total, count)
+            in aggregate_transactions(Transaction.objects.filter(user_id=user_id)).items()
+        ])
+        ledger.rebuild([user_id])
+
+
+def verify_user(user_id):
+    """Return the buckets whose stored rollup disagrees with the transactions.
+
+    Each entry is ``(key, stored, expected)`` where the values are
+    ``(total, count)`` tuples or ``None`` for a missing bucket.
+    """
+    expected = aggregate_transactions(Transaction.objects.filter(user_id=user_id))
+    stored = {
+        (row.user_id, row.month, row.category_id, row.transaction_type): (row.total, row.count)
+        for row in MonthlyRollup.objects.filter(user_id=user_id)
+    }
+    return [
+        (key, stored.get(key), expected.get(key))
+        for key in sorted(set(expected) | set(stored), key=lambda k: (k[1], k[2], k[3]))
+        if stored.get(key) != expected.get(key)
+    ]
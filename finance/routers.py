@@ -0,0 +1,30 @@
+from django.conf import settings
+
+ARCHIVE_DATABASE = 'archive'
+
+
+class ArchiveRouter:
+    """Keep ``ArchivedTransaction`` in the ``archive`` database when one is configured.
+
+    Without an ``archive`` entry in ``DATABASES`` the router has no opinion and
+    everything stays in ``default``.
+    """
+
+    def _archive(self):
+        return ARCHIVE_DATABASE if ARCHIVE_DATABASE in settings.DATABASES else None
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label == 'finance.ArchivedTransaction':
+            return self._archive()
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        archive = self._archive()
+        if archive is None:
+            return None
+        is_archive_model = app_label == 'finance' and model_name == 'archivedtransaction'
+        if db == archive:
+            return is_archive_model
+        return False if is_archive_model else None
@@ -0,0 +1,63 @@
+"""Full-text search over transaction titles and category names.
+
+On SQLite, migration 0014 creates ``finance_transaction_search``, an FTS5
+table with one row per transaction (``rowid`` is the transaction id) and
+triggers on ``finance_transaction`` and ``finance_category`` that keep it in
+sync with every write, including bulk and raw SQL ones. Each row also
+carries an ``owner`` token, so a per-user search intersects two posting
+lists inside the index instead of filtering every match by user afterwards.
+Matches are ranked with BM25, weighting the title above the category.
+
+Other database backends have no FTS5 table and fall back to
+``icontains`` filters ordered newest first.
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+WORD = re.compile(r'\w+')
+# Longer queries add nothing but work for the index.
+MAX_TERMS = 8
+
+
+def terms(text):
+    return WORD.findall(text or '')[:MAX_TERMS]
+
+
+def match_expression(text, user_id=None):
+    """FTS5 query matching every word of ``text`` as a prefix, or ``None`` if it has no words.
+
+    Words are quoted, so FTS5 operators typed by the user are searched for literally.
+    """
+    words = terms(text)
+    if not words:
+        return None
+    expression = '{title category} : (' + ' AND '.join(f'"{word}"*' for word in words) + ')'
+    if user_id is not None:
+        expression = f'owner:u{user_id} AND {expression}'
+    return expression
+
+
+def fts_available(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def search(queryset, text, user_id=None):
+    """Narrow a ``Transaction`` queryset to the rows matching ``text``, best match first.
+
+    ``user_id`` restricts the index lookup to that user's transactions; the
+    queryset should be filtered to the same user.
+    """
+    if fts_available(queryset.db):
+        expression = match_expression(text, user_id)
+        if expression is None:
+            return queryset.none()
+        return queryset.filter(search__document__match=expression).order_by('search__rank', '-date', '-pk')
+
+    words = terms(text)
+    if not words:
+        return queryset.none()
+    for word in words:
+        queryset = queryset.filter(Q(title__icontains=word) | Q(category__name__icontains=word))
+    return queryset.order_by('-date', '-pk')
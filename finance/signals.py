@@ -0,0 +1,79 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from finance import rollups
+from finance.caching import bump_data_version, forget_users
+from finance.models import ArchivedTransaction, Category, CustomUser, Goal, ReportJob, Transaction, UserBalance
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_rollup_state(sender, instance, raw=False, **kwargs):
+    # Instances that were not loaded from the database (e.g. built by hand with
+    # an existing pk) need their previous bucket read before it is overwritten.
+    if raw or instance.pk is None or hasattr(instance, '_rollup_state'):
+        return
+    previous = Transaction.objects.filter(pk=instance.pk).first()
+    instance._rollup_state = previous.rollup_key() if previous else None
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw or rollups.is_suspended():
+        return
+    previous = None if created else getattr(instance, '_rollup_state', None)
+    current = instance.rollup_key()
+    if previous == current:
+        return
+    if previous is not None:
+        rollups.apply_delta(previous[0], -previous[1], -1)
+    if current is not None:
+        rollups.apply_delta(current[0], current[1], 1)
+    instance._rollup_state = current
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    if rollups.is_suspended():
+        return
+    state = getattr(instance, '_rollup_state', None) or instance.rollup_key()
+    if state is not None:
+        rollups.apply_delta(state[0], -state[1], -1)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_user_data_version(sender, instance, raw=False, **kwargs):
+    # Bulk Transaction deletes bump once for the whole queryset instead.
+    if raw or (sender is Transaction and rollups.is_suspended()):
+        return
+    bump_data_version({instance.user_id})
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_users([instance.pk])
+
+
+@receiver(post_delete, sender=CustomUser)
+def delete_archived_transactions(sender, instance, **kwargs):
+    # Archived rows hold a plain user id (they may live in another database), so
+    # they are not reached by the cascade.
+    ArchivedTransaction.objects.filter(user_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=CustomUser)
+def delete_ledger_row(sender, instance, **kwargs):
+    # The cascade can delete the ledger row before the transactions, whose
+    # delete signals then recreate it; drop it again once the user is gone.
+    UserBalance.objects.filter(pk=instance.pk).delete()
+
+
+@receiver(post_delete, sender=ReportJob)
+def delete_report_file(sender, instance, **kwargs):
+    if instance.output:
+        instance.output.delete(save=False)
@@ -1,3 +1,1111 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.contrib.auth.models import Permission
+from django.contrib.auth.views import LogoutView
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.urls import path, reverse
+from django.utils import timezone
+
+from . import (
+    analytics, archive, assets, benchmarking, dashboard, entry, exports, forecasting, imports, jobs, ledger, purge,
+    rollups, search, urls,
+)
+from .db import configure_sqlite
+from .forms import AnalyticsQueryForm
+from .instrumentation import ServerTimingMiddleware
+from .models import (
+    ArchivedTransaction, ArchiveSnapshot, Category, CustomUser, Goal, MonthlyRollup, ReportJob, SiteStats, Transaction,
+    UserBalance,
+)
+
+
+class QueryBudgetTests(TestCase):
+    """Per-view query budgets; a failing count here is a performance regression.
+
+    The session (``cached_db``) and the user (``CachedModelBackend``) come
+    from the cache, so once ``setUp`` has loaded them a request makes no
+    queries before the view runs.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('budget', 'budget@example.com', 'pw-budget-123')
+        today = date.today()
+        categories = [Category.objects.for_name(cls.user, name) for name in ('Food', 'Rent', 'Travel')]
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=cls.user,
+                title=f'Row {i}',
+                amount=Decimal('12.50'),
+                transaction_type='expense' if i % 3 else 'income',
+                date=today - timedelta(days=17 * i),
+                category=categories[i % 3],
+            )
+            for i in range(60)
+        ])
+        Goal.objects.bulk_create([
+            Goal(user=cls.user, name=f'Goal {i}', target_amount=Decimal('100.00'), deadline=today + timedelta(days=30 * i))
+            for i in range(1, 4)
+        ])
+        forecasting.forecast_all()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.client.get(reverse('profile'))
+
+    def test_dashboard(self):
+        # totals, goals; the charts are fetched from the API
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Dashboard-Cache'], 'miss')
+
+    def test_dashboard_recomputes_stale_forecasts(self):
+        Goal.objects.create(user=self.user, name='New goal', target_amount=Decimal('50.00'), deadline=date.today())
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(len(response.context['goal_progress']), 4)
+        self.assertEqual(response.context['goal_progress'][0]['goal'].name, 'New goal')
+
+    def test_dashboard_server_timing(self):
+        response = self.client.get(reverse('dashboard'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="2 queries", tpl;dur=[\d.]+, total;dur=')
+
+    def test_transaction_rows_fragment_follows_data_version(self):
+        self.client.get(reverse('transaction_list'))
+        row = Transaction.objects.filter(user=self.user).order_by('-date', '-pk').first()
+        row.title = 'Renamed row'
+        row.save()
+        response = self.client.get(reverse('transaction_list'))
+        self.assertContains(response, 'Renamed row')
+
+    def test_dashboard_cached(self):
+        self.client.get(reverse('dashboard'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response['X-Dashboard-Cache'], 'hit')
+
+    def test_dashboard_cache_invalidated_by_writes(self):
+        self.client.get(reverse('dashboard'))
+        Transaction.objects.create(
+            user=self.user, title='New', amount=Decimal('1.00'), transaction_type='income',
+            date=date.today(), category=Category.objects.for_name(self.user, 'Food'),
+        )
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response['X-Dashboard-Cache'], 'miss')
+        self.assertEqual(response.context['total_income'], Decimal('12.50') * 20 + 1)
+
+    def test_dashboard_totals(self):
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['total_income'], Decimal('12.50') * 20)
+        self.assertEqual(response.context['total_expenses'], Decimal('12.50') * 40)
+
+    def test_dashboard_categories_api(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('api_dashboard_categories'))
+        data = response.json()
+        self.assertEqual(sorted(data['labels']), ['Rent', 'Travel'])
+        self.assertEqual(sum(data['data']), 12.5 * 40)
+
+    def test_dashboard_monthly_api(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('api_dashboard_monthly'))
+        self.assertEqual(len(response.json()['data']), 12)
+
+    def test_dashboard_summary_api(self):
+        response = self.client.get(reverse('api_dashboard_summary'))
+        data = response.json()
+        self.assertEqual(Decimal(data['total_income']), Decimal('12.50') * 20)
+        self.assertEqual(len(data['goals']), 3)
+
+    def test_dashboard_api_not_modified(self):
+        etag = self.client.get(reverse('api_dashboard_monthly'))['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('api_dashboard_monthly'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_dashboard_api_etag_changes_on_write(self):
+        etag = self.client.get(reverse('api_dashboard_summary'))['ETag']
+        Goal.objects.create(user=self.user, name='New', target_amount=Decimal('5.00'), deadline=date.today())
+        response = self.client.get(reverse('api_dashboard_summary'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_transaction_list(self):
+        # page, category filter choices
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('transaction_list'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_transaction_list_category_filter(self):
+        category = Category.objects.get(user=self.user, key='food')
+        # page, filter validation, category filter choices
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('transaction_list'), {'category': category.pk})
+        self.assertTrue(all(t.category_id == category.pk for t in response.context['page']))
+
+    def test_goal_list(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('goal_list'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_dashboard(self):
+        SiteStats.refresh()
+        self.user.is_staff = True
+        self.user.save()
+        # user (reloaded after the save), stats snapshot, recent users, recent transactions
+        with self.assertNumQueries(1 + 3):
+            response = self.client.get(reverse('admin_dashboard'))
+        self.assertEqual(response.context['total_transactions'], 60)
+        self.assertEqual(response.context['users_with_goals'], 1)
+
+
+class TransactionListPagingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('pager', 'pager@example.com', 'pw-pager-123')
+        today = date.today()
+        categories = [Category.objects.for_name(cls.user, name) for name in ('Food', 'Rent', 'Travel')]
+        Transaction.objects.bulk_create([
+            Transaction(user=cls.user, title=f'Row {i}', amount=Decimal('12.50'),
+                        transaction_type='expense' if i % 3 else 'income',
+                        date=today - timedelta(days=17 * i), category=categories[i % 3])
+            for i in range(120)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.client.get(reverse('profile'))
+
+    def test_transaction_list_later_page(self):
+        first = self.client.get(reverse('transaction_list'))
+        cursor = first.context['page'].next_cursor
+        self.assertIsNotNone(cursor)
+        # A deep page costs the same as the first: page, category filter choices
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('transaction_list'), {'after': cursor, 'transaction_type': 'expense'})
+        self.assertEqual(response.status_code, 200)
+        rows = list(response.context['page'])
+        self.assertTrue(rows and all(row.transaction_type == 'expense' for row in rows))
+        self.assertLess(rows[0].date, list(first.context['page'])[-1].date)
+
+
+class SessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user('sessions', 'sessions@example.com', 'pw-sessions-123')
+        self.client.force_login(self.user)
+
+    def test_cached_user_follows_profile_edits(self):
+        self.client.get(reverse('profile'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('profile'))
+        self.client.post(reverse('profile'), {
+            'username': 'sessions', 'email': 'sessions@example.com', 'first_name': 'Renamed',
+        })
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response.context['user'].get_full_name(), 'Renamed')
+
+    def test_purge_sessions_deletes_expired_in_batches(self):
+        for expiry in (-60, -60, -60, 3600):
+            session = SessionStore()
+            session.set_expiry(expiry)
+            session.create()
+        live = Session.objects.filter(expire_date__gt=timezone.now()).count()
+        self.assertEqual(live, 2)  # the test client's own session and one more
+
+        out = StringIO()
+        call_command('purge_sessions', batch_size=2, stdout=out)
+        self.assertIn('Deleted 3 expired session(s).', out.getvalue())
+        self.assertEqual(Session.objects.count(), live)
+        self.assertTrue(Session.objects.filter(pk=self.client.session.session_key).exists())
+
+
+class GoalForecastTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('saver', 'saver@example.com', 'pw-saver-123')
+        self.today = date(2026, 7, 15)
+        salary = Category.objects.for_name(self.user, 'Salary')
+        # 600 saved before the window, then 300 a month for six months: balance 2400.
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, title='Savings', amount=Decimal('600.00'), transaction_type='income',
+                        date=date(2025, 12, 1), category=salary),
+        ] + [
+            Transaction(user=self.user, title='Salary', amount=Decimal('300.00'), transaction_type='income',
+                        date=date(2026, month, 1), category=salary)
+            for month in range(1, 7)
+        ])
+
+    def goal(self, name, target, deadline):
+        return Goal.objects.create(user=self.user, name=name, target_amount=Decimal(target), deadline=deadline)
+
+    def test_allocates_in_deadline_order_and_projects_completion(self):
+        late = self.goal('Car', '3000.00', date(2026, 9, 1))
+        early = self.goal('Holiday', '2000.00', date(2026, 8, 1))
+        soonest = self.goal('House', '100.00', date(2026, 7, 20))
+
+        self.assertEqual(forecasting.forecast_users([self.user.pk], today=self.today), 3)
+
+        soonest.forecast.refresh_from_db()
+        early.forecast.refresh_from_db()
+        late.forecast.refresh_from_db()
+        # The earliest deadline is funded first, even though it was created last.
+        self.assertEqual(soonest.forecast.allocated, Decimal('100.00'))
+        self.assertTrue(soonest.forecast.on_track)
+        self.assertEqual(early.forecast.allocated, Decimal('2000.00'))
+        self.assertEqual(early.forecast.progress, 100)
+        self.assertEqual(late.forecast.allocated, Decimal('300.00'))
+        self.assertEqual(late.forecast.progress, 10)
+        # 2700 still needed at 300 a month is roughly nine months out.
+        self.assertEqual(late.forecast.projected_completion.strftime('%Y-%m'), '2027-04')
+        self.assertFalse(late.forecast.on_track)
+
+    def test_goal_unreachable_without_savings(self):
+        Transaction.objects.create(
+            user=self.user, title='Rent', amount=Decimal('1800.00'), transaction_type='expense',
+            date=date(2026, 6, 2), category=Category.objects.for_name(self.user, 'Rent'),
+        )
+        goal = self.goal('Boat', '5000.00', date(2030, 1, 1))
+        forecasting.forecast_users([self.user.pk], today=self.today)
+        goal.forecast.refresh_from_db()
+        self.assertIsNone(goal.forecast.projected_completion)
+        self.assertFalse(goal.forecast.on_track)
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('rollup', 'rollup@example.com', 'pw-rollup-123')
+        self.food = Category.objects.for_name(self.user, 'Food')
+        self.rent = Category.objects.for_name(self.user, 'Rent')
+
+    def add(self, amount, day=date(2026, 3, 10), category=None, transaction_type='expense'):
+        return Transaction.objects.create(
+            user=self.user, title='Row', amount=Decimal(amount), transaction_type=transaction_type,
+            date=day, category=category or self.food,
+        )
+
+    def assertRollupsMatch(self):
+        self.assertEqual(rollups.verify_user(self.user.pk), [])
+
+    def test_single_row_writes(self):
+        row = self.add('10.00')
+        self.add('5.00', transaction_type='income')
+        self.assertRollupsMatch()
+        row.amount = Decimal('12.00')
+        row.save()
+        self.assertRollupsMatch()
+        row.date = date(2026, 4, 2)
+        row.category = self.rent
+        row.save()
+        self.assertRollupsMatch()
+        self.assertFalse(MonthlyRollup.objects.filter(user=self.user, month=date(2026, 3, 1), category=self.food,
+                                                      transaction_type='expense').exists())
+        row.delete()
+        self.assertRollupsMatch()
+
+    def test_bulk_writes(self):
+        # Raw string values, as an import builds them, still land in the right bucket.
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, title='Bulk', amount=f'{i}.50', transaction_type='expense',
+                        date=f'2026-0{1 + i % 3}-15', category=self.food)
+            for i in range(1, 10)
+        ])
+        self.assertRollupsMatch()
+        Transaction.objects.filter(user=self.user, date__month=1).update(amount=Decimal('1.00'))
+        self.assertRollupsMatch()
+        Transaction.objects.filter(user=self.user, date__month=2).update(date=date(2026, 5, 1), category=self.rent)
+        self.assertRollupsMatch()
+        Transaction.objects.filter(user=self.user, date__month=3).delete()
+        self.assertRollupsMatch()
+        self.assertEqual(set(MonthlyRollup.objects.filter(user=self.user).values_list('month', flat=True)),
+                         {date(2026, 1, 1), date(2026, 5, 1)})
+
+    def test_suspended_writes_are_recounted(self):
+        self.add('10.00')
+        with rollups.suspended():
+            self.add('7.00', day=date(2026, 6, 1))
+        self.assertEqual(len(rollups.verify_user(self.user.pk)), 1)
+        rollups.rebuild_user(self.user.pk)
+        self.assertRollupsMatch()
+        self.assertEqual(ledger.verify([self.user.pk]), [])
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('ledger', 'ledger@example.com', 'pw-ledger-123')
+        self.food = Category.objects.for_name(self.user, 'Food')
+
+    def add(self, amount, transaction_type='expense', day=1):
+        return Transaction.objects.create(
+            user=self.user, title='Row', amount=Decimal(amount), transaction_type=transaction_type,
+            date=date(2026, 3, day), category=self.food,
+        )
+
+    def balance(self):
+        row = UserBalance.objects.get(pk=self.user.pk)
+        return row.total_income, row.total_expenses, row.transaction_count
+
+    def test_every_write_path_keeps_the_ledger_exact(self):
+        salary = self.add('1000.00', 'income')
+        rent = self.add('400.00')
+        self.assertEqual(self.balance(), (Decimal('1000.00'), Decimal('400.00'), 2))
+
+        rent.amount = Decimal('450.00')
+        rent.transaction_type = 'income'
+        rent.save()
+        salary.delete()
+        self.assertEqual(self.balance(), (Decimal('450.00'), Decimal('0.00'), 1))
+
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, title='Bulk', amount=Decimal('5.00'), transaction_type='expense',
+                        date=date(2026, 4, day), category=self.food)
+            for day in range(1, 11)
+        ])
+        Transaction.objects.filter(title='Bulk', date__day__lte=5).update(amount=Decimal('7.00'))
+        Transaction.objects.filter(title='Bulk', date__day__gt=8).delete()
+        self.assertEqual(self.balance(), (Decimal('450.00'), Decimal('50.00'), 9))
+        self.assertEqual(ledger.verify([self.user.pk]), [])
+        self.assertEqual(dashboard.build_summary(self.user)['balance'], Decimal('400.00'))
+
+    def test_reconcile_repairs_drift(self):
+        self.add('20.00')
+        UserBalance.objects.filter(pk=self.user.pk).update(total_expenses=Decimal('99.00'))
+
+        with self.assertRaises(CommandError):
+            call_command('reconcile_balances', '--check', stdout=StringIO())
+        call_command('reconcile_balances', stdout=StringIO())
+        self.assertEqual(self.balance(), (Decimal('0.00'), Decimal('20.00'), 1))
+
+    def test_users_without_transactions_have_no_drift(self):
+        # A new user has no ledger row until their first transaction.
+        self.assertFalse(UserBalance.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(ledger.verify([self.user.pk]), [])
+        out = StringIO()
+        call_command('reconcile_balances', '--check', stdout=out)
+        self.assertIn('match', out.getvalue())
+
+    def test_deleting_the_user_removes_the_ledger_row(self):
+        self.add('20.00')
+        self.user.delete()
+        self.assertFalse(UserBalance.objects.exists())
+
+
+class AnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('analyst', 'analyst@example.com', 'pw-analyst-123')
+        categories = [Category.objects.for_name(cls.user, name) for name in ('Food', 'Salary')]
+        Transaction.objects.bulk_create([
+            Transaction(user=cls.user, title=f'Row {i}', amount=Decimal(10 + i), category=categories[i % 2],
+                        transaction_type='income' if i % 2 else 'expense', date=date(2024, 1, 1) + timedelta(days=9 * i))
+            for i in range(60)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_grouped_columns_match_rows(self):
+        params = {'start': '2024-01-01', 'end': '2024-12-31', 'grain': 'quarter',
+                  'group_by': ['type'], 'measures': ['count', 'sum', 'avg']}
+        self.client.get(reverse('profile'))
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('api_analytics'), params)
+        result = response.json()
+        self.assertEqual(response['X-Analytics-Cache'], 'miss')
+        self.assertEqual(result['columns'], ['period', 'type', 'sum', 'count', 'avg'])
+        columns = dict(zip(result['columns'], result['data']))
+        self.assertEqual(columns['period'][:2], ['2024-01-01', '2024-01-01'])
+        rows = Transaction.objects.filter(user=self.user, date__year=2024)
+        self.assertEqual(sum(columns['count']), rows.count())
+        self.assertAlmostEqual(sum(columns['sum']), float(sum(row.amount for row in rows)))
+        q1_expense = rows.filter(date__month__lte=3, transaction_type='expense')
+        self.assertEqual(columns['avg'][0], round(float(sum(row.amount for row in q1_expense)) / q1_expense.count(), 2))
+
+        self.assertEqual(self.client.get(reverse('api_analytics'), params)['X-Analytics-Cache'], 'hit')
+        Transaction.objects.filter(user=self.user).first().delete()
+        self.assertEqual(self.client.get(reverse('api_analytics'), params)['X-Analytics-Cache'], 'miss')
+
+    def test_archived_rows_of_a_renamed_category_merge(self):
+        food = Category.objects.get(user=self.user, name='Food')
+        ArchivedTransaction.objects.bulk_create([
+            ArchivedTransaction(id=10_000 + i, user_id=self.user.pk, title=f'Old {i}', amount=Decimal(4),
+                                transaction_type='expense', date=date(2023, 1, 5), category_id=food.pk,
+                                category_name=name)
+            for i, name in enumerate(['Groceries', 'Groceries', 'Eating'])
+        ])
+        CustomUser.objects.filter(pk=self.user.pk).update(archived_until=date(2024, 1, 1))
+        self.user.refresh_from_db()
+        query = {'start': date(2023, 1, 1), 'end': date(2023, 12, 31), 'grain': 'year',
+                 'group_by': ['category'], 'measures': ['sum', 'count']}
+        result = analytics.run(self.user, query)
+        self.assertEqual(result['rows'], 1)
+        self.assertEqual(result['data'][2:], [[12.0], [3]])
+
+    def test_row_cap_and_validation(self):
+        with mock.patch.object(analytics, 'MAX_ROWS', 5):
+            result = self.client.get(reverse('api_analytics'), {'start': '2024-01-01', 'grain': 'day'}).json()
+        self.assertEqual((result['rows'], result['truncated']), (5, True))
+        response = self.client.get(reverse('api_analytics'), {'grain': 'decade', 'start': '2025-01-01', 'end': '2024-01-01'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('grain', response.json()['errors'])
+
+
+class BulkEntryTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('entry', 'entry@example.com', 'pw-entry-123')
+        self.client.force_login(self.user)
+
+    def rows(self, count):
+        return [{'title': f'Row {i}', 'amount': f'{i + 1}.25', 'transaction_type': 'expense',
+                 'date': f'2026-05-{i + 1:02d}', 'category': 'Food' if i % 2 else 'Rent'} for i in range(count)]
+
+    def formset_data(self, rows, blank=0):
+        # Blank rows still post the prefilled date, as a browser does.
+        rows = rows + [{'date': date.today().isoformat()}] * blank
+        data = {'form-TOTAL_FORMS': len(rows), 'form-INITIAL_FORMS': 0}
+        for index, row in enumerate(rows):
+            data.update({f'form-{index}-{field}': value for field, value in row.items()})
+        return data
+
+    def test_formset_saves_filled_rows_only(self):
+        self.assertEqual(self.client.get(reverse('transaction_bulk_add')).status_code, 200)
+        response = self.client.post(reverse('transaction_bulk_add'), self.formset_data(self.rows(3), blank=2))
+        self.assertRedirects(response, reverse('transaction_list'))
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(Category.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(ledger.verify([self.user.pk]), [])
+
+        rows = self.rows(2)
+        rows[1]['amount'] = 'lots'
+        response = self.client.post(reverse('transaction_bulk_add'), self.formset_data(rows))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['formset'].forms[1].errors)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 3)
+
+    def test_json_api_is_all_or_nothing(self):
+        url = reverse('api_transactions')
+        response = self.client.post(url, self.rows(4), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        ids = response.json()['ids']
+        self.assertEqual(sorted(ids), sorted(Transaction.objects.filter(user=self.user).values_list('pk', flat=True)))
+        self.assertEqual(UserBalance.objects.get(pk=self.user.pk).total_expenses, Decimal('11.00'))
+
+        rows = self.rows(3)
+        del rows[2]['date']
+        response = self.client.post(url, rows, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['row'] for error in response.json()['errors']], [2])
+        self.assertIn('date', response.json()['errors'][0]['errors'])
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 4)
+
+        self.assertEqual(self.client.post(url, 'not json', content_type='application/json').status_code, 400)
+        with mock.patch.object(entry, 'MAX_JSON_ROWS', 2):
+            self.assertEqual(self.client.post(url, self.rows(3), content_type='application/json').status_code, 400)
+
+
+class ImportTests(TestCase):
+    CSV = (
+        'Posted,Description,Amount,Category\n'
+        '2024-01-05,Coffee,-3.50,Food\n'
+        '05/01/2024,Coffee,-3.50,food\n'
+        '2024-01-06,Salary,"2,500.00",\n'
+        'not a date,Broken,-1.00,\n'
+        '2024-01-07,Nothing,NaN,\n'
+        '2024-01-08,,-2.00,\n'
+    )
+    OFX = (
+        'OFXHEADER:100\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>'
+        '<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240110120000<TRNAMT>-42.10<FITID>A1<NAME>Grocer</STMTTRN>'
+        '<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240111<TRNAMT>100.00<FITID>A2<MEMO>Refund</STMTTRN>'
+        '</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>'
+    )
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('importer', 'importer@example.com', 'pw-importer-123')
+
+    def upload(self, content, name='statement.csv'):
+        return SimpleUploadedFile(name, content if isinstance(content, bytes) else content.encode())
+
+    def test_csv_rows_rejects_and_repeated_rows(self):
+        report = imports.import_file(self.user, self.upload(self.CSV), batch_size=2)
+        self.assertEqual((report.total, report.created, report.duplicates, report.rejected), (6, 3, 0, 3))
+        self.assertEqual([line for line, _ in report.rejects], [5, 6, 7])
+        self.assertIn("invalid amount 'NaN'", report.rejects[1][1])
+        # Two identical coffees on the same day are both kept.
+        coffees = Transaction.objects.filter(user=self.user, title='Coffee')
+        self.assertEqual(coffees.count(), 2)
+        # 'Food' and 'food' resolve to one category, whichever spelling named it.
+        self.assertEqual({(row.transaction_type, row.amount, row.category.key) for row in coffees},
+                         {('expense', Decimal('3.50'), 'food')})
+        salary = Transaction.objects.get(user=self.user, title='Salary')
+        self.assertEqual((salary.transaction_type, salary.amount, salary.category.name),
+                         ('income', Decimal('2500.00'), imports.DEFAULT_CATEGORY))
+
+    def test_reupload_creates_nothing(self):
+        imports.import_file(self.user, self.upload(self.CSV))
+        report = imports.import_file(self.user, self.upload(self.CSV))
+        self.assertEqual((report.created, report.duplicates), (0, 3))
+        # A third identical coffee in a later statement is new.
+        report = imports.import_file(self.user, self.upload(self.CSV + '2024-01-05,Coffee,-3.50,Food\n'))
+        self.assertEqual((report.created, report.duplicates), (1, 3))
+        self.assertEqual(ledger.verify([self.user.pk]), [])
+
+    def test_reupload_after_archiving_creates_nothing(self):
+        statement = 'Date,Title,Amount\n2015-03-02,Rent,-700.00\n2015-03-09,Wages,1500.00\n'
+        imports.import_file(self.user, self.upload(statement))
+        archive.archive_before(date(2020, 1, 1))
+        report = imports.import_file(self.user, self.upload(statement))
+        self.assertEqual((report.created, report.duplicates), (0, 2))
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+        self.assertEqual(UserBalance.objects.get(pk=self.user.pk).transaction_count, 2)
+        self.assertEqual(ledger.verify([self.user.pk]), [])
+
+    def test_ofx_uses_bank_ids(self):
+        report = imports.import_file(self.user, self.upload(self.OFX, 'statement.qfx'))
+        self.assertEqual((report.created, report.rejected), (2, 0))
+        refund = Transaction.objects.get(user=self.user, title='Refund')
+        self.assertEqual((refund.date, refund.transaction_type), (date(2024, 1, 11), 'income'))
+        edited = self.OFX.replace('<NAME>Grocer', '<NAME>Grocer Ltd')
+        self.assertEqual(imports.import_file(self.user, self.upload(edited, 'statement.ofx')).created, 0)
+
+    def test_non_utf8_upload(self):
+        content = 'Date,Title,Amount\n2024-02-01,Caf\u00e9 cr\u00e8me \u20ac,-4.20\n'.encode('cp1252')
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('transaction_import'), {'file': self.upload(content)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['report'].created, 1)
+        self.assertTrue(Transaction.objects.filter(user=self.user, title='Caf\u00e9 cr\u00e8me \u20ac').exists())
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('exporter', 'exporter@example.com', 'pw-exporter-123')
+        other = CustomUser.objects.create_user('neighbour', 'neighbour@example.com', 'pw-neighbour-123')
+        cls.food = Category.objects.for_name(cls.user, 'Food')
+        salary = Category.objects.for_name(cls.user, 'Salary')
+        Transaction.objects.bulk_create([
+            Transaction(user=cls.user, title=f'Row {i}', amount=Decimal(10 + i), category=salary if i % 2 else cls.food,
+                        transaction_type='income' if i % 2 else 'expense', date=date(2025, 1, 1) + timedelta(days=40 - i))
+            for i in range(40)
+        ] + [
+            Transaction(user=other, title='Not mine', amount=Decimal('1.00'), transaction_type='expense',
+                        date=date(2025, 1, 10), category=Category.objects.for_name(other, 'Food')),
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def csv_lines(self, params):
+        response = self.client.get(reverse('export_transactions'), {'format': 'csv', **params})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_csv_is_filtered_and_ordered(self):
+        lines = self.csv_lines({})
+        self.assertEqual(lines[0], 'date,title,amount,transaction_type')
+        self.assertEqual(len(lines), 1 + 40)
+        self.assertEqual(lines[1:], sorted(lines[1:]))
+        self.assertNotIn('Not mine', '\n'.join(lines))
+
+        lines = self.csv_lines({'transaction_type': 'expense', 'date_from': '2025-01-11', 'date_to': '2025-01-30'})
+        rows = [line.split(',') for line in lines[1:]]
+        self.assertEqual(len(rows), 10)
+        self.assertTrue(all(row[3] == 'expense' and '2025-01-11' <= row[0] <= '2025-01-30' for row in rows))
+        self.assertEqual(len(self.csv_lines({'category': self.food.pk})), 1 + 20)
+
+    def test_csv_streams_in_pieces(self):
+        with mock.patch.object(exports, 'CSV_FLUSH_BYTES', 100):
+            pieces = list(exports.iter_csv(Transaction.objects.filter(user=self.user), chunk_size=7))
+        self.assertGreater(len(pieces), 5)
+        self.assertEqual(len(''.join(pieces).splitlines()), 1 + 40)
+
+    def test_xlsx_matches_csv(self):
+        from openpyxl import load_workbook
+
+        response = self.client.get(reverse('export_transactions'), {'transaction_type': 'income'})
+        self.assertEqual(response['Content-Type'], exports.XLSX_CONTENT_TYPE)
+        sheet = load_workbook(BytesIO(b''.join(response.streaming_content)), read_only=True)['Transactions']
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(rows[0], exports.EXPORT_FIELDS)
+        self.assertEqual(len(rows), 1 + 20)
+        self.assertEqual({row[3] for row in rows[1:]}, {'income'})
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse('export_transactions'), {'format': 'csv'})
+        self.assertEqual(response.status_code, 302)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('finder', 'finder@example.com', 'pw-finder-123')
+        self.other = CustomUser.objects.create_user('other', 'other@example.com', 'pw-other-123')
+        self.food = Category.objects.for_name(self.user, 'Groceries')
+        self.coffee = Category.objects.for_name(self.user, 'Coffee')
+
+    def add(self, title, category, user=None):
+        return Transaction.objects.create(
+            user=user or self.user, title=title, amount=Decimal('5.00'), transaction_type='expense',
+            date=date(2026, 5, 1), category=category,
+        )
+
+    def titles(self, text):
+        return [row.title for row in search.search(Transaction.objects.filter(user=self.user), text, self.user.pk)]
+
+    def test_ranked_prefix_search_kept_in_sync(self):
+        tesco = self.add('Tesco weekly shop', self.food)
+        self.add('Café Nero', self.coffee)
+        self.add('Coffee beans', self.food)
+        self.add('Coffee beans', Category.objects.for_name(self.other, 'Coffee'), user=self.other)
+
+        # Title matches rank above category-only matches; accents are folded.
+        self.assertEqual(self.titles('coff'), ['Coffee beans', 'Café Nero'])
+        self.assertEqual(self.titles('cafe'), ['Café Nero'])
+        self.assertEqual(self.titles('tes shop'), ['Tesco weekly shop'])
+        self.assertEqual(self.titles('"OR" NEAR'), [])
+
+        tesco.title = 'Sainsbury'
+        tesco.save()
+        self.coffee.name = 'Treats'
+        self.coffee.save()
+        self.assertEqual(self.titles('tesco'), [])
+        self.assertEqual(self.titles('sains'), ['Sainsbury'])
+        self.assertEqual(self.titles('treats'), ['Café Nero'])
+        Transaction.objects.filter(title='Sainsbury').delete()
+        self.assertEqual(self.titles('sains'), [])
+
+    def test_list_search_is_paged_by_number(self):
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, title=f'Lunch {i}', amount=Decimal('5.00'), transaction_type='expense',
+                        date=date(2026, 5, 1), category=self.food)
+            for i in range(60)
+        ])
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('transaction_list'), {'q': 'lunch'})
+        page = response.context['page']
+        self.assertEqual((len(page), page.next_param, page.next_cursor), (50, 'page', 2))
+        response = self.client.get(reverse('transaction_list'), {'q': 'lunch', 'page': 2})
+        self.assertEqual(len(response.context['page']), 10)
+        self.assertNotIn('page=', response.context['filter_query'])
+
+    def test_admin_search_uses_index(self):
+        self.add('Tesco weekly shop', self.food)
+        admin_user = CustomUser.objects.create_superuser('root', 'root@example.com', 'pw-root-123')
+        self.client.force_login(admin_user)
+        response = self.client.get(reverse('admin:finance_transaction_changelist'), {'q': 'tesc'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('keeper', 'keeper@example.com', 'pw-keeper-123')
+        categories = [Category.objects.for_name(cls.user, name) for name in ('Salary', 'Food', 'Rent')]
+        # Roughly one row a month from 2019 into 2026.
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=cls.user,
+                title=f'Row {i}',
+                amount=Decimal(10 + i),
+                transaction_type='income' if i % 3 == 0 else 'expense',
+                date=date(2019, 1, 5) + timedelta(days=30 * i),
+                category=categories[i % 3],
+            )
+            for i in range(90)
+        ])
+        cls.cutoff = date(2023, 1, 1)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_archiving_keeps_dashboard_totals(self):
+        summary = dashboard.build_summary(self.user)
+        categories = dashboard.build_categories(self.user)
+        old = Transaction.objects.filter(date__lt=self.cutoff).count()
+
+        report = archive.archive_before(self.cutoff, batch_size=7)
+
+        self.user.refresh_from_db()
+        self.assertEqual(report.archived, old)
+        self.assertEqual(self.user.archived_until, self.cutoff)
+        self.assertFalse(Transaction.objects.filter(date__lt=self.cutoff).exists())
+        self.assertEqual(ArchivedTransaction.objects.count(), old)
+        self.assertEqual(sum(ArchiveSnapshot.objects.values_list('count', flat=True)), old)
+        after = dashboard.build_summary(self.user)
+        for key in ('total_income', 'total_expenses', 'balance'):
+            self.assertEqual(after[key], summary[key])
+        self.assertEqual(dashboard.build_categories(self.user), categories)
+        self.assertEqual(ledger.verify([self.user.pk]), [])
+
+    def test_list_pages_through_archived_rows(self):
+        expected = list(Transaction.objects.order_by('-date', '-pk').values_list('pk', flat=True))
+        archive.archive_before(self.cutoff)
+
+        seen, archived, params = [], 0, {}
+        while True:
+            response = self.client.get(reverse('transaction_list'), params)
+            page = response.context['page']
+            seen += [row.pk for row in page]
+            archived += sum(row.is_archived for row in page)
+            if not page.has_next:
+                break
+            params = {'after': page.next_cursor}
+        self.assertEqual(seen, expected)
+        self.assertEqual(archived, ArchivedTransaction.objects.count())
+
+        response = self.client.get(reverse('transaction_list'), {'before': page.previous_cursor})
+        self.assertEqual([row.pk for row in response.context['page']], expected[:50])
+
+    def test_export_includes_archived_rows_on_request(self):
+        archive.archive_before(self.cutoff)
+        live = b''.join(self.client.get(reverse('export_transactions'), {'format': 'csv'}).streaming_content)
+        full = b''.join(self.client.get(
+            reverse('export_transactions'), {'format': 'csv', 'include_archived': '1'},
+        ).streaming_content)
+        self.assertEqual(len(live.splitlines()), 1 + Transaction.objects.count())
+        self.assertEqual(len(full.splitlines()), 1 + 90)
+        self.assertIn(b'2019-01-05,Row 0,', full.splitlines()[1])
+
+    def test_analytics_include_archived_rows(self):
+        form = AnalyticsQueryForm({'start': '2019-01-01', 'grain': 'year', 'group_by': ['category', 'type']})
+        self.assertTrue(form.is_valid())
+        before = analytics.run(self.user, form.cleaned_data)
+        archive.archive_before(self.cutoff)
+        self.user.refresh_from_db()
+        self.assertEqual(analytics.run(self.user, form.cleaned_data), before)
+
+    def test_cutoff_must_be_new_year(self):
+        with self.assertRaises(ValueError):
+            archive.archive_before(date(2023, 6, 1))
+
+
+class ReportJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('reporter', 'reporter@example.com', 'pw-reporter-123')
+        cls.other = CustomUser.objects.create_user('bystander', 'bystander@example.com', 'pw-bystander-123')
+        category = Category.objects.for_name(cls.user, 'Misc')
+        Transaction.objects.bulk_create([
+            Transaction(user=cls.user, title=f'Row {i}', amount=Decimal(5 + i), category=category,
+                        transaction_type='income' if i % 2 else 'expense', date=date(2024, 1, 1) + timedelta(days=i))
+            for i in range(30)
+        ])
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root, FINTRACK_EXPORT_INLINE_MAX_ROWS=10))
+        self.client.force_login(self.user)
+
+    def test_large_export_runs_in_background(self):
+        params = {'format': 'csv', 'transaction_type': 'income'}
+        response = self.client.get(reverse('export_transactions'), {**params, 'background': '1'})
+        self.assertRedirects(response, f"{reverse('report_list')}?format=csv&transaction_type=income")
+        self.assertFalse(ReportJob.objects.exists())
+        form = self.client.get(response.url)
+        self.assertEqual(form.context['queue_params'], {'transaction_type': 'income'})
+        self.assertContains(form, 'csrfmiddlewaretoken')
+
+        self.client.post(reverse('report_list'), params)
+        self.client.post(reverse('report_list'), params)
+        job = ReportJob.objects.get()
+        self.assertEqual(job.format, 'csv')
+        self.assertEqual(job.params, {'transaction_type': 'income'})
+
+        self.assertTrue(jobs.run(jobs.claim('test')))
+        status = self.client.get(reverse('api_report_status', args=[job.pk])).json()
+        self.assertEqual(status['status'], 'done')
+        content = b''.join(self.client.get(status['download_url']).streaming_content)
+        self.assertEqual(len(content.splitlines()), 1 + 15)
+
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(status['download_url']).status_code, 404)
+        job.refresh_from_db()
+        path = Path(job.output.path)
+        self.assertTrue(path.exists())
+        job.delete()
+        self.assertFalse(path.exists())
+
+    def test_queueing_needs_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        self.assertEqual(client.post(reverse('report_list'), {'format': 'csv'}).status_code, 403)
+        self.assertFalse(ReportJob.objects.exists())
+
+    def test_claim_respects_per_user_limit(self):
+        first = jobs.enqueue(self.user, 'csv', {})
+        second = jobs.enqueue(self.user, 'xlsx', {})
+        other = jobs.enqueue(self.other, 'csv', {})
+
+        self.assertEqual(jobs.claim('a', limit=1), first)
+        self.assertEqual(jobs.claim('b', limit=1), other)
+        self.assertIsNone(jobs.claim('c', limit=1))
+
+        ReportJob.objects.filter(pk=first.pk).update(started_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale(timeout=60), 1)
+        self.assertEqual(jobs.claim('c', limit=1), first)
+        jobs.run(ReportJob.objects.get(pk=first.pk))
+        self.assertEqual(jobs.claim('d', limit=1), second)
+
+
+class PurgeTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.users = [CustomUser.objects.create_user(f'leaver{i}', f'leaver{i}@example.com', 'pw-leaver-123')
+                      for i in range(2)]
+        for user in self.users:
+            categories = [Category.objects.for_name(user, name) for name in ('Food', 'Salary')]
+            Transaction.objects.bulk_create([
+                Transaction(user=user, title=f'Row {i}', amount=Decimal(5 + i), category=categories[i % 2],
+                            transaction_type='income' if i % 2 else 'expense', date=date(2020, 1, 1) + timedelta(days=20 * i))
+                for i in range(40)
+            ])
+            Goal.objects.create(user=user, name='Trip', target_amount=Decimal('500.00'), deadline=date(2027, 1, 1))
+        archive.archive_before(date(2021, 1, 1), user_ids=[self.users[0].pk])
+        self.job = jobs.enqueue(self.users[0], 'csv', {})
+        jobs.run(jobs.claim('test'))
+        self.job.refresh_from_db()
+
+    def owned(self, user_id):
+        return {name: count for name, count in purge.related_counts([user_id]).items() if name != 'users'}
+
+    def test_purge_is_batched_and_resumable(self):
+        leaver, stayer = self.users
+        path = Path(self.job.output.path)
+        self.assertTrue(path.exists())
+        self.assertGreater(self.owned(leaver.pk)['archived transactions'], 0)
+
+        def interrupt(name, deleted):
+            if name == 'transactions':
+                raise KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            purge.purge_user(leaver.pk, batch_size=7, progress=interrupt)
+        leaver.refresh_from_db()
+        self.assertFalse(leaver.is_active)
+        self.assertFalse(path.exists())
+
+        out = StringIO()
+        call_command('purge_accounts', str(leaver.pk), '--batch-size', '7', stdout=out)
+        self.assertIn(f'User {leaver.pk} deleted', out.getvalue())
+        self.assertFalse(CustomUser.objects.filter(pk=leaver.pk).exists())
+        self.assertEqual(self.owned(leaver.pk), {})
+        self.assertEqual(search.search(Transaction.objects.all(), 'row').count(), 40)
+        self.assertEqual(ledger.verify([stayer.pk]), [])
+
+    def test_admin_purges_outside_a_transaction(self):
+        admin_user = CustomUser.objects.create_superuser('root', 'root@example.com', 'pw-root-123')
+        self.client.force_login(admin_user)
+        # TestCase wraps every test in atomic blocks; the purge must not add another.
+        depth = len(connection.atomic_blocks)
+        depths = []
+
+        def record(pk):
+            depths.append(len(connection.atomic_blocks))
+        with mock.patch.object(purge, 'purge_user', side_effect=record):
+            # The stock delete view commits first; the purge runs once it has.
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('admin:finance_customuser_delete', args=[self.users[0].pk]), {'post': 'yes'})
+                self.assertEqual(depths, [])
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('admin:finance_customuser_changelist'), {
+                    'action': 'delete_selected', '_selected_action': [self.users[1].pk], 'post': 'yes',
+                })
+        self.assertEqual(depths, [depth, depth])
+
+    def test_admin_delete_needs_delete_permission_on_owned_data(self):
+        staff = CustomUser.objects.create_user('clerk', 'clerk@example.com', 'pw-clerk-123', is_staff=True)
+        staff.user_permissions.set(Permission.objects.filter(
+            content_type__app_label='finance', codename__in=['view_customuser', 'delete_customuser'],
+        ))
+        self.client.force_login(staff)
+        url = reverse('admin:finance_customuser_delete', args=[self.users[0].pk])
+        response = self.client.get(url)
+        self.assertIn('transaction', response.context['perms_lacking'])
+        self.assertEqual(self.client.post(url, {'post': 'yes'}).status_code, 403)
+        self.assertTrue(CustomUser.objects.filter(pk=self.users[0].pk).exists())
+
+    def test_admin_delete_uses_purge(self):
+        admin_user = CustomUser.objects.create_superuser('root', 'root@example.com', 'pw-root-123')
+        self.client.force_login(admin_user)
+        leaver = self.users[1]
+        url = reverse('admin:finance_customuser_delete', args=[leaver.pk])
+        response = self.client.get(url)
+        self.assertContains(response, 'Transactions: 40')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(CustomUser.objects.filter(pk=leaver.pk).exists())
+        self.assertEqual(self.owned(leaver.pk), {})
+
+
+class BenchmarkTests(TestCase):
+    def test_seed_and_run_every_route(self):
+        report = benchmarking.seed(users=2, transactions=300, years=2, goals_per_user=2)
+        self.assertEqual((report.users, report.transactions, report.goals), (2, 300, 4))
+        user = CustomUser.objects.get(username='bench00000')
+        self.assertTrue(user.is_staff)
+
+        results = benchmarking.run(user, iterations=2, warmup=0)
+        self.assertEqual(set(results['routes']), {name for name, _, _ in benchmarking.ROUTES})
+        self.assertEqual({result['status'] for result in results['routes'].values()}, {200})
+
+        slower = {'routes': {name: dict(result, p95_ms=result['p95_ms'] * 2 + 1)
+                             for name, result in results['routes'].items()}}
+        self.assertEqual(benchmarking.compare(results, results), [])
+        self.assertEqual(len(benchmarking.compare(slower, results)), len(results['routes']))
+
+        templates = benchmarking.run_templates(user, rows=50, iterations=2)
+        self.assertEqual(set(templates['modes']), {'uncached_loader', 'cached_loader', 'fragment_hit'})
+
+        entries = benchmarking.run_entry(user, rows=6, batch_size=3)
+        self.assertEqual(entries['modes']['json']['requests'], 2)
+        self.assertFalse(Transaction.objects.filter(user=user, title=benchmarking.ENTRY_TITLE).exists())
+
+
+class StartupTests(TestCase):
+    def test_export_libraries_load_on_first_use(self):
+        result = benchmarking.run_startup(runs=1, top=3)
+        self.assertEqual(result['deferred_loaded'], [])
+        self.assertEqual(len(result['slowest_imports']), 3)
+        budgets = {'budget_ms': 60_000, 'budget_rss_mb': 10_000}
+        self.assertEqual(benchmarking.check_startup(result, **budgets), [])
+        self.assertEqual(len(benchmarking.check_startup(dict(result, deferred_loaded=['openpyxl']), **budgets)), 1)
+
+        admin_user = CustomUser.objects.create_superuser('root', 'root@example.com', 'pw-root-123')
+        food = Category.objects.for_name(admin_user, 'Food')
+        row = Transaction.objects.create(user=admin_user, title='Lunch', amount=Decimal('9.50'),
+                                         transaction_type='expense', date=date(2026, 5, 1), category=food)
+        self.client.force_login(admin_user)
+        url = reverse('admin:finance_transaction_changelist')
+        response = self.client.post(url, {'action': 'export_csv', '_selected_action': [row.pk]})
+        self.assertEqual(response.content.decode().splitlines(), ['title,amount,transaction_type,date',
+                                                                  'Lunch,9.50,expense,2026-05-01'])
+        response = self.client.post(url, {'action': 'export_xlsx', '_selected_action': [row.pk]})
+        self.assertEqual(response['Content-Type'], exports.XLSX_CONTENT_TYPE)
+
+
+class StaticAssetTests(TestCase):
+    def test_logo_variants_and_precompressed_copies(self):
+        with tempfile.TemporaryDirectory() as root:
+            root = Path(root)
+            for name in assets.LOGO_WIDTHS:
+                shutil.copy(Path(settings.STATICFILES_DIRS[0]) / name, root / name)
+            (root / 'site.css').write_text('body { color: #fff; }\n' * 100)
+
+            written = {path.name for path, _ in assets.build_logos(root)}
+            self.assertIn('logo3-80.webp', written)
+            self.assertEqual(len(written), 2 * 2 * len(assets.LOGO_WIDTHS))
+
+            [(path, original, gz, _)] = assets.precompress(root)
+            self.assertEqual(path.name, 'site.css')
+            self.assertLess(gz, original)
+            self.assertTrue((root / 'site.css.gz').exists())
+
+
+class ServerTimingMiddlewareTests(TestCase):
+    def test_logs_repeated_queries(self):
+        user = CustomUser.objects.create_user('loopy', 'loopy@example.com', 'pw-loopy-123')
+
+        def view(request):
+            for _ in range(6):
+                CustomUser.objects.get(pk=user.pk)
+            return HttpResponse()
+
+        with self.assertLogs('finance.performance', 'WARNING') as logs:
+            ServerTimingMiddleware(view)(RequestFactory().get('/loop/'))
+        self.assertIn('repeated query', logs.output[0])
+        self.assertIn('"count": 6', logs.output[0])
+
+    @override_settings(FINTRACK_SLOW_REQUEST_MS=0)
+    def test_logs_slow_requests(self):
+        with self.assertLogs('finance.performance', 'WARNING') as logs:
+            ServerTimingMiddleware(lambda request: HttpResponse())(RequestFactory().get('/slow/'))
+        self.assertIn('slow request', logs.output[0])
+
+
+class SQLiteProfileTests(TestCase):
+    @override_settings(FINTRACK_SQLITE_PRAGMAS={'cache_size': -4321})
+    def test_pragmas_applied_to_new_connections(self):
+        configure_sqlite(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -4321)
+
+
+class AsyncURLConf:
+    urlpatterns = urls.build_urlpatterns(async_views=True) + [
+        path('logout/', LogoutView.as_view(), name='logout'),
+    ]
+
+
+@override_settings(ROOT_URLCONF=AsyncURLConf)
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('async', 'async@example.com', 'pw-async-123', is_staff=True)
+        food = Category.objects.for_name(cls.user, 'Food')
+        Transaction.objects.bulk_create([
+            Transaction(user=cls.user, title=f'Row {i}', amount=Decimal('10.00'),
+                        transaction_type='income' if i % 2 else 'expense', date=date.today() - timedelta(days=i),
+                        category=food if i % 3 else Category.objects.for_name(cls.user, 'Rent'))
+            for i in range(60)
+        ])
+        Goal.objects.create(user=cls.user, name='Trip', target_amount=Decimal('50.00'), deadline=date.today())
+        cls.food = food
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_requires_login(self):
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+    async def test_dashboard_matches_sync_totals(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_income'], Decimal('300.00'))
+        self.assertEqual(response.context['goal_progress'][0]['goal'].name, 'Trip')
+        self.assertEqual(response['X-Dashboard-Cache'], 'miss')
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response['X-Dashboard-Cache'], 'hit')
+
+    async def test_transaction_list_filters_and_pages(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('transaction_list'), {'category': self.food.pk})
+        self.assertEqual(response.status_code, 200)
+        page = response.context['page']
+        self.assertEqual(len(page), 40)
+        self.assertFalse(page.has_next)
+        self.assertContains(response, 'Rent')  # category choices rendered without a lazy query
+
+        response = await self.async_client.get(reverse('transaction_list'))
+        self.assertTrue(response.context['page'].has_next)
+
+    async def test_goal_list_and_admin_dashboard(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('goal_list'))
+        self.assertContains(response, 'Trip')
+        response = await self.async_client.get(reverse('admin_dashboard'))
+        self.assertEqual(response.context['total_transactions'], 60)
@@ -1,16 +1,44 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from finance.views import landing_view, RegisterView, DashboardView, TransactionView, TransactionListView, GoalCreateView, GoalListView, ProfileView, AdminDashboardView, export_transactions
-urlpatterns = [
-   path('', landing_view, name='landing'),
-   path('login/', auth_views.LoginView.as_view(template_name='finance/registration/login.html'), name='login'),
-   path('register/', RegisterView.as_view(), name='register'),
-   path('dashboard/', DashboardView.as_view(), name='dashboard'),
-    path('admin-dashboard/', AdminDashboardView.as_view(), name='admin_dashboard'),
-    path('profile/', ProfileView.as_view(), name='profile'),
-   path('transaction/add/', TransactionView.as_view(), name='transaction_add'),
-   path('transactions/', TransactionListView.as_view(), name='transaction_list'),
-    path('goals/', GoalListView.as_view(), name='goal_list'),
-   path('goal/add/', GoalCreateView.as_view(), name='goal_add'),
-   path('generate-report/', export_transactions, name='export_transactions'),
-]
+from finance.api import AnalyticsView, DashboardSummaryView, DashboardCategoriesView, DashboardMonthlyView, ReportStatusView, TransactionBulkCreateView
+from finance.async_views import AsyncAdminDashboardView, AsyncDashboardView, AsyncGoalListView, AsyncTransactionListView
+from finance.views import landing_view, RegisterView, DashboardView, TransactionView, TransactionBulkView, TransactionImportView, TransactionListView, GoalCreateView, GoalListView, ProfileView, AdminDashboardView, ReportListView, export_transactions, download_report
+
+
+def build_urlpatterns(async_views=False):
+    """The app's routes, with the async read views when ``async_views`` is set."""
+    if async_views:
+        dashboard_view, admin_dashboard_view, transaction_list_view, goal_list_view = (
+            AsyncDashboardView, AsyncAdminDashboardView, AsyncTransactionListView, AsyncGoalListView,
+        )
+    else:
+        dashboard_view, admin_dashboard_view, transaction_list_view, goal_list_view = (
+            DashboardView, AdminDashboardView, TransactionListView, GoalListView,
+        )
+    return [
+        path('', landing_view, name='landing'),
+        path('login/', auth_views.LoginView.as_view(template_name='finance/registration/login.html'), name='login'),
+        path('register/', RegisterView.as_view(), name='register'),
+        path('dashboard/', dashboard_view.as_view(), name='dashboard'),
+        path('admin-dashboard/', admin_dashboard_view.as_view(), name='admin_dashboard'),
+        path('profile/', ProfileView.as_view(), name='profile'),
+        path('transaction/add/', TransactionView.as_view(), name='transaction_add'),
+        path('transactions/add/', TransactionBulkView.as_view(), name='transaction_bulk_add'),
+        path('transactions/', transaction_list_view.as_view(), name='transaction_list'),
+        path('transactions/import/', TransactionImportView.as_view(), name='transaction_import'),
+        path('goals/', goal_list_view.as_view(), name='goal_list'),
+        path('goal/add/', GoalCreateView.as_view(), name='goal_add'),
+        path('generate-report/', export_transactions, name='export_transactions'),
+        path('reports/', ReportListView.as_view(), name='report_list'),
+        path('reports/<int:pk>/download/', download_report, name='download_report'),
+        path('api/dashboard/summary', DashboardSummaryView.as_view(), name='api_dashboard_summary'),
+        path('api/dashboard/categories', DashboardCategoriesView.as_view(), name='api_dashboard_categories'),
+        path('api/dashboard/monthly', DashboardMonthlyView.as_view(), name='api_dashboard_monthly'),
+        path('api/transactions', TransactionBulkCreateView.as_view(), name='api_transactions'),
+        path('api/analytics', AnalyticsView.as_view(), name='api_analytics'),
+        path('api/reports/<int:pk>', ReportStatusView.as_view(), name='api_report_status'),
+    ]
+
+
+urlpatterns = build_urlpatterns(settings.FINTRACK_ASYNC_VIEWS)
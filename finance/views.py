@@ -1,15 +1,24 @@
-from django.shortcuts import render, redirect, HttpResponse
+from django.conf import settings
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404, render, redirect
+from django.urls import reverse
 from django.views import View
-from finance.forms import CustomUserCreationForm, CustomUserChangeForm, TransactionForm, GoalForm
+from django.db import transaction
+from django.utils.decorators import method_decorator
+from finance.forms import CustomUserCreationForm, CustomUserChangeForm, TransactionForm, TransactionFilterForm, TransactionFormSet, TransactionImportForm, GoalForm
 from django.contrib.auth import login
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from .models import Transaction, Goal, CustomUser
-from django.db.models import Sum
-from django.db.models.functions import TruncMonth
-from .admin import TransactionResource
+from .models import ReportJob, Transaction, Goal, CustomUser, SiteStats
+from . import dashboard, entry, exports, imports, jobs, ledger, search
+from .exports import archived_transactions
+from .pagination import paginate_keyset, paginate_ranked
 from django.contrib import messages
 from datetime import date
 
+# Write views run in one transaction, which the production database profile
+# opens with BEGIN IMMEDIATE (see FINTRACK_DB_PROFILE in settings).
+@method_decorator(transaction.atomic, name='post')
 class RegisterView(View):
     def get(self, request, *args, **kwargs):
         form = CustomUserCreationForm()
@@ -27,104 +36,21 @@ class RegisterView(View):
 
 class DashboardView(LoginRequiredMixin, View):
     def get(self, request, *args, **kwargs):
-        transactions = Transaction.objects.filter(user=request.user)
-        goals = Goal.objects.filter(user=request.user)  # ✅ fetch all goals
-
-        # Calculate totals
-        total_income = transactions.filter(transaction_type='income').aggregate(Sum('amount'))['amount__sum'] or 0
-        total_expenses = transactions.filter(transaction_type='expense').aggregate(Sum('amount'))['amount__sum'] or 0
-        balance = total_income - total_expenses
-        remaining_balance = balance
-
-        # Expense breakdown by category for pie chart
-        expense_by_category = (
-            transactions
-            .filter(transaction_type='expense')
-            .values('category')
-            .annotate(total=Sum('amount'))
-            .order_by('-total')
-        )
-
-        expense_breakdown_labels = [entry['category'] for entry in expense_by_category]
-        expense_breakdown_data = [float(entry['total']) for entry in expense_by_category]
-        top_expense_category = expense_breakdown_labels[0] if expense_breakdown_labels else None
-        top_expense_amount = expense_breakdown_data[0] if expense_breakdown_data else 0
-
-        # Monthly expenses for last 12 months (histogram data)
-        expense_monthly_qs = (
-            transactions
-            .filter(transaction_type='expense')
-            .annotate(month=TruncMonth('date'))
-            .values('month')
-            .annotate(total=Sum('amount'))
-        )
-
-        expense_month_to_total = {row['month']: float(row['total']) for row in expense_monthly_qs}
-
-        today_dt = date.today()
-        start_year = today_dt.year
-        start_month = today_dt.month
-        monthly_labels = []
-        monthly_expense_data = []
-        for offset in range(11, -1, -1):
-            total_months = start_year * 12 + start_month - 1 - offset
-            year = total_months // 12
-            month = total_months % 12 + 1
-            month_date = date(year, month, 1)
-            monthly_labels.append(month_date.strftime('%b %Y'))
-            monthly_expense_data.append(expense_month_to_total.get(month_date, 0.0))
-
-        # Calculate goal progress
-        goal_progress = []
-        for goal in goals:  #  loop over the queryset, not a single object
-            if remaining_balance >= goal.target_amount:
-                goal_progress.append({
-                    'goal': goal,
-                    'progress': 100
-                })
-                remaining_balance -= goal.target_amount
-            elif remaining_balance > 0:
-                progress = (remaining_balance / goal.target_amount) * 100
-                goal_progress.append({
-                    'goal': goal.name,
-                    'progress': progress
-                })
-                remaining_balance = 0
-            else:
-                goal_progress.append({
-                    'goal': goal,
-                    'progress': 0
-                })
+        # Only the summary is rendered here; the charts load from finance.api.
+        context, hit = dashboard.get_section(request.user, 'summary')
+        response = render(request, 'finance/dashboard.html', context)
+        response['X-Dashboard-Cache'] = 'hit' if hit else 'miss'
+        return response
 
-        context = {
-            'transactions': transactions,
-            'goals': goals,
-            'goal_progress': goal_progress,
-            'total_income': total_income,
-            'total_expenses': total_expenses,
-            'balance': balance,
-            'expense_breakdown': {
-                'labels': expense_breakdown_labels,
-                'data': expense_breakdown_data,
-            },
-            'top_expense_category': top_expense_category,
-            'top_expense_amount': top_expense_amount,
-            'monthly_expenses': {
-                'labels': monthly_labels,
-                'data': monthly_expense_data,
-            },
-        }
-
-        return render(request, 'finance/dashboard.html', context)
 
-        
+@method_decorator(transaction.atomic, name='post')
 class TransactionView(LoginRequiredMixin, View):
     def get(self, request, *args, **kwargs):
-        form = TransactionForm()
+        form = TransactionForm(user=request.user)
         return render(request, 'finance/transaction_form.html', {'form': form, 'today': date.today().isoformat()})
 
     def post(self, request, *args, **kwargs):
-        form = TransactionForm(request.POST)
+        form = TransactionForm(request.POST, user=request.user)
         if form.is_valid():
             transaction = form.save(commit=False)
             transaction.user = request.user
@@ -134,10 +60,77 @@ class TransactionView(LoginRequiredMixin, View):
         return render(request, 'finance/transaction_form.html', {'form': form, 'today': date.today().isoformat()})
 
 
+@method_decorator(transaction.atomic, name='post')
+class TransactionBulkView(LoginRequiredMixin, View):
+    """Several transactions entered on one page and saved together."""
+
+    def formset(self, request, data=None):
+        return TransactionFormSet(data, form_kwargs={'user': request.user, 'initial': {'date': date.today()}})
+
+    def get(self, request, *args, **kwargs):
+        return render(request, 'finance/transaction_bulk_form.html', {'formset': self.formset(request)})
+
+    def post(self, request, *args, **kwargs):
+        formset = self.formset(request, request.POST)
+        if formset.is_valid():
+            created = entry.create_transactions(request.user, [form for form in formset if form.has_changed()])
+            messages.success(request, f'{len(created)} transactions added successfully.')
+            return redirect('transaction_list')
+        return render(request, 'finance/transaction_bulk_form.html', {'formset': formset})
+
+
+class TransactionImportView(LoginRequiredMixin, View):
+    def get(self, request, *args, **kwargs):
+        form = TransactionImportForm()
+        return render(request, 'finance/transaction_import.html', {'form': form})
+
+    def post(self, request, *args, **kwargs):
+        form = TransactionImportForm(request.POST, request.FILES)
+        report = None
+        if form.is_valid():
+            report = imports.import_file(
+                request.user,
+                form.cleaned_data['file'],
+                file_format=form.cleaned_data['file_format'] or None,
+            )
+            messages.success(request, f'Import finished: {report.summary()}.')
+        return render(request, 'finance/transaction_import.html', {'form': form, 'report': report})
+
+
 class TransactionListView(LoginRequiredMixin, View):
+    paginate_by = 50
+
     def get(self, request, *args, **kwargs):
-        transactions = Transaction.objects.filter(user=request.user)
-        return render(request, 'finance/transaction_list.html', {'transactions': transactions})
+        filter_form = TransactionFilterForm(request.GET, user=request.user)
+        transactions = filter_form.filter(Transaction.objects.filter(user=request.user).select_related('category'))
+        if filter_form.search_text:
+            # Search covers live transactions only; archived ones are not indexed.
+            page = paginate_ranked(
+                search.search(transactions, filter_form.search_text, user_id=request.user.pk),
+                page=request.GET.get('page'),
+                per_page=self.paginate_by,
+            )
+        else:
+            page = paginate_keyset(
+                transactions,
+                after=request.GET.get('after'),
+                before=request.GET.get('before'),
+                per_page=self.paginate_by,
+                archive=archived_transactions(request.user, filter_form),
+                archive_until=request.user.archived_until,
+            )
+
+        # Filters are carried over to the next/previous links, the cursor is not.
+        filter_params = request.GET.copy()
+        for param in ('after', 'before', 'page'):
+            filter_params.pop(param, None)
+
+        return render(request, 'finance/transaction_list.html', {
+            'transactions': page,
+            'page': page,
+            'filter_form': filter_form,
+            'filter_query': filter_params.urlencode(),
+        })
 
 
 class GoalListView(LoginRequiredMixin, View):
@@ -146,6 +139,7 @@ class GoalListView(LoginRequiredMixin, View):
         return render(request, 'finance/goal_list.html', {'goals': goals})
 
 
+@method_decorator(transaction.atomic, name='post')
 class GoalCreateView(LoginRequiredMixin, View):
     def get(self, request, *args, **kwargs):
         form = GoalForm()
@@ -170,30 +164,34 @@ class AdminDashboardView(LoginRequiredMixin, View):
             messages.error(request, 'Access denied. Staff privileges required.')
             return redirect('dashboard')
 
-        total_users = CustomUser.objects.count()
-        active_users = CustomUser.objects.filter(is_active=True).count()
-        total_transactions = Transaction.objects.count()
-        total_goals = Goal.objects.count()
-
+        stats = SiteStats.current()
         recent_users = CustomUser.objects.order_by('-date_joined')[:5]
-        recent_transactions = Transaction.objects.select_related('user').order_by('-date')[:10]
-
-        users_with_transactions = CustomUser.objects.filter(transaction__isnull=False).distinct().count()
-        users_with_goals = CustomUser.objects.filter(goal__isnull=False).distinct().count()
+        recent_transactions = Transaction.objects.select_related('user', 'category').order_by('-date')[:10]
 
         context = {
-            'total_users': total_users,
-            'active_users': active_users,
-            'total_transactions': total_transactions,
-            'total_goals': total_goals,
+            'stats': stats,
+            'total_users': stats.total_users,
+            'active_users': stats.active_users,
+            'total_transactions': stats.total_transactions,
+            'total_goals': stats.total_goals,
             'recent_users': recent_users,
             'recent_transactions': recent_transactions,
-            'users_with_transactions': users_with_transactions,
-            'users_with_goals': users_with_goals,
+            'users_with_transactions': stats.users_with_transactions,
+            'users_with_goals': stats.users_with_goals,
         }
 
         return render(request, 'finance/admin_dashboard.html', context)
 
+    def post(self, request, *args, **kwargs):
+        if not request.user.is_staff:
+            messages.error(request, 'Access denied. Staff privileges required.')
+            return redirect('dashboard')
+
+        SiteStats.refresh()
+        messages.success(request, 'Site statistics refreshed.')
+        return redirect('admin_dashboard')
+
+@method_decorator(transaction.atomic, name='post')
 class ProfileView(LoginRequiredMixin, View):
     def get(self, request, *args, **kwargs):
         form = CustomUserChangeForm(instance=request.user)
@@ -202,22 +200,59 @@ class ProfileView(LoginRequiredMixin, View):
     def post(self, request, *args, **kwargs):
         form = CustomUserChangeForm(request.POST, instance=request.user)
         if form.is_valid():
-            form.save()
+            # request.user may come from the user cache; only write the edited
+            # fields so a stale copy cannot overwrite e.g. data_version.
+            user = form.save(commit=False)
+            user.save(update_fields=[*form.Meta.fields, 'updated_at'])
             messages.success(request, 'Profile updated successfully.')
             return redirect('profile')
         return render(request, 'finance/profile.html', {'form': form})
 
+@login_required
 def export_transactions(request):
-    user_transactions = Transaction.objects.filter(user=request.user)
-    
-    transaction_resource = TransactionResource()
-    dataset = transaction_resource.export(queryset=user_transactions)
-    
-    excel_data = dataset.export('xlsx')
-    
-    # Create an HttpResponse with the correct MIME type for an Excel file
-    response = HttpResponse(excel_data, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    
-    # Set the header to prompt a download
-    response['Content-Disposition'] = 'attachment; filename="transactions.xlsx"'
-    return response
\ No newline at end of file
+    fmt = 'csv' if request.GET.get('format') == 'csv' else 'xlsx'
+    # The ledger row count (live plus archived) bounds the export size without counting rows.
+    if (request.GET.get('background') == '1'
+            or ledger.get_balance(request.user).transaction_count > settings.FINTRACK_EXPORT_INLINE_MAX_ROWS):
+        # Queuing a job is a write, so it is left to the form on the Reports page.
+        query = request.GET.copy()
+        query.pop('background', None)
+        messages.info(request, 'This report is generated in the background. Queue it below.')
+        return redirect(f"{reverse('report_list')}?{query.urlencode()}")
+
+    filter_form = TransactionFilterForm(request.GET, user=request.user)
+    user_transactions = filter_form.filter(Transaction.objects.filter(user=request.user))
+    archived = archived_transactions(request.user, filter_form) if request.GET.get('include_archived') == '1' else None
+
+    if fmt == 'csv':
+        return exports.csv_response(user_transactions, archived=archived)
+    return exports.xlsx_response(user_transactions, archived=archived)
+
+
+class ReportListView(LoginRequiredMixin, View):
+    def get(self, request, *args, **kwargs):
+        reports = list(ReportJob.objects.filter(user=request.user).order_by('-created_at')[:20])
+        return render(request, 'finance/report_list.html', {
+            'reports': reports,
+            'pending': any(report.is_pending for report in reports),
+            'queue_format': 'csv' if request.GET.get('format') == 'csv' else 'xlsx',
+            'queue_params': jobs.export_params(request.GET),
+        })
+
+    def post(self, request, *args, **kwargs):
+        fmt = 'csv' if request.POST.get('format') == 'csv' else 'xlsx'
+        try:
+            jobs.enqueue(request.user, fmt, jobs.export_params(request.POST))
+        except jobs.QueueFull:
+            messages.error(request, 'You have too many reports in progress. Try again once some are ready.')
+        else:
+            messages.info(request, 'Your report is being generated and will be ready to download here.')
+        return redirect('report_list')
+
+
+@login_required
+def download_report(request, pk):
+    report = get_object_or_404(ReportJob, pk=pk, user=request.user, status=ReportJob.DONE)
+    content_type = 'text/csv' if report.format == 'csv' else exports.XLSX_CONTENT_TYPE
+    return FileResponse(report.output.open('rb'), as_attachment=True, filename=report.filename,
+                        content_type=content_type)
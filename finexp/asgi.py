@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finexp.settings')
+# Under ASGI the read-heavy views run natively async (see finance.async_views).
+os.environ.setdefault('FINTRACK_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -38,11 +38,13 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'finance',  # Your finance app
-    'import_export',  # Django Import-Export
-    
+    # django-import-export is used as a library (finance.resources) and is
+    # not installed as an app: admin autodiscovery would import its admin
+    # module, and with it tablib and openpyxl, in every worker.
 ]
 
 MIDDLEWARE = [
+    'finance.instrumentation.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,17 +56,30 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'finexp.urls'
 
+# Compiled templates are kept by the cached loader. Under runserver the
+# autoreloader clears it when a template changes, so it is safe in development
+# too. FINTRACK_TEMPLATE_DEBUG=0 also drops the debug bookkeeping that only
+# serves error pages; it follows DEBUG by default.
+FINTRACK_TEMPLATE_DEBUG = os.environ.get('FINTRACK_TEMPLATE_DEBUG', '1' if DEBUG else '0') == '1'
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates plus render timing for ServerTimingMiddleware.
+        'BACKEND': 'finance.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+            'debug': FINTRACK_TEMPLATE_DEBUG,
         },
     },
 ]
@@ -75,12 +90,140 @@ WSGI_APPLICATION = 'finexp.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+#
+# FINTRACK_DB_PROFILE=production tunes SQLite for several concurrent workers:
+# WAL journaling, a busy timeout, a larger page cache and memory-mapped reads
+# (applied per connection by finance.db.configure_sqlite), persistent
+# connections, and BEGIN IMMEDIATE for atomic blocks so write views take the
+# write lock up front instead of failing on lock upgrade.
+FINTRACK_DB_PROFILE = os.environ.get('FINTRACK_DB_PROFILE', 'development')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('FINTRACK_DB_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
+FINTRACK_SQLITE_PRAGMAS = {}
+
+# Archived transactions (finance.archive) stay in the main database unless
+# FINTRACK_ARCHIVE_DB_PATH names a separate SQLite file for them.
+if os.environ.get('FINTRACK_ARCHIVE_DB_PATH'):
+    DATABASES['archive'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['FINTRACK_ARCHIVE_DB_PATH'],
+    }
+DATABASE_ROUTERS = ['finance.routers.ArchiveRouter']
+FINTRACK_ARCHIVE_HORIZON_YEARS = int(os.environ.get('FINTRACK_ARCHIVE_HORIZON_YEARS', '3'))
+
+if FINTRACK_DB_PROFILE == 'production':
+    for database in DATABASES.values():
+        database.update({
+            'CONN_MAX_AGE': int(os.environ.get('FINTRACK_CONN_MAX_AGE', '600')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
+        })
+    FINTRACK_SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 20000,
+        'cache_size': -64000,  # KiB, i.e. 64 MB
+        'mmap_size': 268435456,  # 256 MB
+        'temp_store': 'MEMORY',
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# FINTRACK_CACHE_BACKEND selects the cache used for dashboard data:
+#   locmem - per-process memory (default; fine for a single worker)
+#   file   - shared directory, for several workers on one host
+#   redis  - Redis or a compatible server (e.g. Valkey, KeyDB), for several hosts;
+#            requires the ``redis`` package
+FINTRACK_CACHE_BACKEND = os.environ.get('FINTRACK_CACHE_BACKEND', 'locmem')
+
+if FINTRACK_CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('FINTRACK_CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+        }
+    }
+elif FINTRACK_CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('FINTRACK_CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'fintrack',
+        }
+    }
+
+# Dashboard entries are keyed on CustomUser.data_version, so the timeout only
+# bounds how long superseded entries linger.
+FINTRACK_DASHBOARD_CACHE = 'default'
+FINTRACK_DASHBOARD_CACHE_TIMEOUT = 60 * 60
+# {% cache %} fragments (the transaction rows, dashboard goals and nav links)
+# use the default cache too; their keys include CustomUser.data_version.
+
+# Sessions and the signed-in user are read from the cache too, so a cached
+# request costs no queries before the view runs. A write only clears the
+# cache of the process that made it; with the per-process locmem cache and
+# several workers (the production database profile) both fall back to the
+# database unless set explicitly.
+#   FINTRACK_SESSION_BACKEND: cached_db (default), db, or signed_cookies
+#   (no server-side storage; sessions cannot be revoked before they expire)
+_PROCESS_LOCAL_CACHE = FINTRACK_CACHE_BACKEND == 'locmem' and FINTRACK_DB_PROFILE == 'production'
+FINTRACK_SESSION_BACKEND = os.environ.get('FINTRACK_SESSION_BACKEND', 'db' if _PROCESS_LOCAL_CACHE else 'cached_db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[FINTRACK_SESSION_BACKEND]
+# finance.backends.CachedModelBackend keeps users for this many seconds (0 disables it);
+# ModelBackend stays listed so sessions created before it was added stay valid.
+AUTHENTICATION_BACKENDS = ['finance.backends.CachedModelBackend', 'django.contrib.auth.backends.ModelBackend']
+FINTRACK_USER_CACHE = 'default'
+FINTRACK_USER_CACHE_TIMEOUT = int(os.environ.get('FINTRACK_USER_CACHE_TIMEOUT', '0' if _PROCESS_LOCAL_CACHE else '300'))
+
+
+# Serve the dashboard, transaction list, goal list and admin dashboard from
+# the async views in finance.async_views. finexp/asgi.py turns this on.
+FINTRACK_ASYNC_VIEWS = os.environ.get('FINTRACK_ASYNC_VIEWS', '0') == '1'
+
+# Background report jobs (finance.jobs, run by `manage.py run_workers`).
+# Exports of users with more rows than FINTRACK_EXPORT_INLINE_MAX_ROWS are
+# queued instead of generated in the request; each user has at most
+# FINTRACK_REPORT_JOBS_PER_USER of them running at once.
+FINTRACK_EXPORT_INLINE_MAX_ROWS = int(os.environ.get('FINTRACK_EXPORT_INLINE_MAX_ROWS', '5000'))
+FINTRACK_REPORT_JOBS_PER_USER = int(os.environ.get('FINTRACK_REPORT_JOBS_PER_USER', '1'))
+FINTRACK_REPORT_JOB_TIMEOUT = int(os.environ.get('FINTRACK_REPORT_JOB_TIMEOUT', str(30 * 60)))
+FINTRACK_REPORT_POLL_INTERVAL = 1.0
+
+# Request instrumentation (finance.instrumentation.ServerTimingMiddleware)
+FINTRACK_SERVER_TIMING = os.environ.get('FINTRACK_SERVER_TIMING', '1') == '1'
+FINTRACK_SLOW_REQUEST_MS = int(os.environ.get('FINTRACK_SLOW_REQUEST_MS', '500'))
+FINTRACK_REPEATED_QUERY_THRESHOLD = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'finance.performance': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
 
 
 # Password validation
@@ -123,6 +266,21 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),  # project-level static (development)
 ]
 
+# With FINTRACK_STATIC_MANIFEST on (the default when DEBUG is off), static URLs
+# carry a content hash, so the web server can cache them for a year. Run
+# `manage.py build_static` on deploy: hashed names only exist after
+# collectstatic has written the manifest.
+FINTRACK_STATIC_MANIFEST = os.environ.get('FINTRACK_STATIC_MANIFEST', '0' if DEBUG else '1') == '1'
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.ManifestStaticFilesStorage' if FINTRACK_STATIC_MANIFEST
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+
 # Media files (User uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')